@@ -7,35 +7,78 @@ to the existing dependency analysis system.
 """
 
 import os
+import re
 import sys
 import json
+import pickle
+import heapq
+import hashlib
+from itertools import chain
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, List, Any, Set
+from typing import Dict, List, Any, Set, Optional
+
+# Optional fast JSON decoder
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Import existing functionality
 from core.knowledge_graph import KnowledgeGraph, KnowledgeNode, KnowledgeEdge, RelationType
 
+# Name keywords for _determine_architectural_role; group N maps to _ROLE_NAMES[N-1].
+# The lookahead makes finditer report overlapping keywords at every position.
+_ROLE_RE = re.compile(
+    r'(?=(main|app)|(controller|handler)|(service|business)|(model|entity)'
+    r'|(util|helper)|(config|setting)|(test))',
+    re.IGNORECASE
+)
+_ROLE_NAMES = ('entry_point', 'controller', 'service', 'model', 'utility', 'configuration', 'test')
+
+DEPENDENCIES_PATH = Path("dependency_analysis/dependencies.json")
+
+def _parse_dependencies(raw: bytes) -> Dict[str, Any]:
+    """Decode the raw bytes of the dependencies JSON file."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw.decode('utf-8'))
+
 def load_dependencies():
     """Load dependencies from the JSON file."""
-    dependencies_path = Path("dependency_analysis/dependencies.json")
-    if dependencies_path.exists():
-        with open(dependencies_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+    if DEPENDENCIES_PATH.exists():
+        return _parse_dependencies(DEPENDENCIES_PATH.read_bytes())
     return {"files": {}, "dependencies": {}}
 
 class EnhancedDependencyAnalyzer:
     """Enhanced analyzer with knowledge graph capabilities."""
     
+    __slots__ = ('kg', 'dependency_data', 'data_version', '_suffix_index', '_dependencies_digest')
+    
     def __init__(self):
         self.kg = KnowledgeGraph()
         self.dependency_data = None
+        self.data_version = 0  # Bumped whenever dependency_data is loaded or changed
+        self._suffix_index: Dict[str, List[str]] = {}
+        self._dependencies_digest: Optional[str] = None
         
     def load_and_enhance_data(self) -> bool:
         """Load existing dependency data and build knowledge graph."""
-        self.dependency_data = load_dependencies()
+        if DEPENDENCIES_PATH.exists():
+            raw = DEPENDENCIES_PATH.read_bytes()
+            self.dependency_data = _parse_dependencies(raw)
+            # Architectural analysis is cached per content hash of the dependency data
+            self._dependencies_digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+        else:
+            self.dependency_data = load_dependencies()
+            self._dependencies_digest = None
+        self.data_version += 1
         if not self.dependency_data:
             return False
         
+        self._build_suffix_index()
+        
         # Try to load existing knowledge graph first
         if not self.kg.load_from_local_storage():
             print("📊 Building new knowledge graph...")
@@ -48,11 +91,31 @@ class EnhancedDependencyAnalyzer:
         
         return True
     
+    def mark_data_changed(self):
+        """Record an in-place update of dependency_data, so analyses cached from it are rebuilt."""
+        self.data_version += 1
+    
+    def _build_suffix_index(self):
+        """Index every dependency path under each of its path-component suffixes.
+        
+        'a/b/c.py' is reachable as 'c.py', 'b/c.py' and 'a/b/c.py', so partial
+        paths given on the command line resolve with one dict lookup.
+        """
+        index: Dict[str, List[str]] = {}
+        for path in self.dependency_data.get('dependencies', {}):
+            index.setdefault(path, []).append(path)
+            for i, char in enumerate(path):
+                if char in '/\\':
+                    index.setdefault(path[i + 1:], []).append(path)
+        self._suffix_index = index
+    
     def _build_knowledge_graph(self):
         """Build knowledge graph from dependency data."""
-        # Add file nodes
-        for file_path, file_info in self.dependency_data['files'].items():
-            node = KnowledgeNode(
+        files = self.dependency_data['files']
+        
+        # Collect file nodes
+        nodes = [
+            KnowledgeNode(
                 id=f"file:{file_path}",
                 type="file",
                 name=file_path,
@@ -63,35 +126,45 @@ class EnhancedDependencyAnalyzer:
                 },
                 file_path=file_path
             )
-            self.kg.add_node(node)
+            for file_path, file_info in files.items()
+        ]
         
-        # Add dependency edges
+        # Collect dependency edges
+        edges = []
         for source_file, deps in self.dependency_data['dependencies'].items():
             source_id = f"file:{source_file}"
             
             for dep in deps:
-                target_id = f"file:{dep['target']}" if dep['target'] in self.dependency_data['files'] else f"external:{dep['target']}"
-                
-                # Add external dependencies as nodes
-                if target_id.startswith("external:"):
-                    ext_node = KnowledgeNode(
+                target = dep['target']
+                if target in files:
+                    target_id = f"file:{target}"
+                else:
+                    # Add external dependencies as nodes
+                    target_id = f"external:{target}"
+                    nodes.append(KnowledgeNode(
                         id=target_id,
                         type="external",
-                        name=dep['target'],
+                        name=target,
                         attributes={"type": "external_dependency"}
-                    )
-                    self.kg.add_node(ext_node)
+                    ))
                 
-                edge = KnowledgeEdge(
+                edges.append(KnowledgeEdge(
                     source=source_id,
                     target=target_id,
                     relationship=dep['type'],
                     attributes={"dependency_type": dep['type']}
-                )
-                self.kg.add_edge(edge)
+                ))
+        
+        self.kg.add_nodes_bulk(nodes)
+        self.kg.add_edges_bulk(edges)
     
     def analyze_architecture(self) -> Dict[str, Any]:
         """Perform architectural analysis using knowledge graph."""
+        cache_path = self._architecture_cache_path()
+        cached = self._load_architecture_cache(cache_path)
+        if cached is not None:
+            return cached
+        
         analysis = {}
         
         # Detect patterns
@@ -109,35 +182,95 @@ class EnhancedDependencyAnalyzer:
                 frameworks[framework] = [self.kg.nodes[f].name for f in files]
         analysis['detected_frameworks'] = frameworks
         
+        self._save_architecture_cache(cache_path, analysis)
         return analysis
     
-    def find_critical_components(self) -> List[Dict[str, Any]]:
-        """Find components critical to the system architecture."""
-        critical = []
-        
-        # High-dependency components
-        for node_id, neighbors in self.kg.adjacency.items():
-            if len(neighbors) > 5:  # Threshold for high dependency
-                node = self.kg.nodes[node_id]
-                critical.append({
-                    'component': node.name,
+    def _architecture_cache_path(self) -> Optional[Path]:
+        """
+        Cache file for the architectural analysis of the current data.
+        
+        The key covers the dependency file's content, the knowledge graph file
+        (by modification time and size) and data_version, so the cache is
+        rebuilt when either file or the in-memory data changes.
+        """
+        if not self._dependencies_digest:
+            return None
+        try:
+            st = os.stat(self.kg.storage_path)
+            kg_key = f"{st.st_mtime_ns}:{st.st_size}"
+        except OSError:
+            kg_key = "none"
+        key = f"{self._dependencies_digest}:{kg_key}:{self.data_version}"
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+        return DEPENDENCIES_PATH.parent / f".arch_cache_{digest}.pkl"
+    
+    def _load_architecture_cache(self, cache_path: Optional[Path]) -> Optional[Dict[str, Any]]:
+        """Return the architectural analysis cached at cache_path, if any."""
+        if not cache_path or not cache_path.exists():
+            return None
+        try:
+            with open(cache_path, 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            print(f"Warning: Could not load architecture cache: {e}")
+            return None
+    
+    def _save_architecture_cache(self, cache_path: Optional[Path], analysis: Dict[str, Any]):
+        """Store the architectural analysis at cache_path, replacing caches for older data."""
+        if not cache_path:
+            return
+        try:
+            for stale in cache_path.parent.glob(".arch_cache_*.pkl"):
+                stale.unlink()
+            with open(cache_path, 'wb') as f:
+                pickle.dump(analysis, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            print(f"Warning: Could not save architecture cache: {e}")
+    
+    def find_critical_components(self, top_k: int = 50) -> List[Dict[str, Any]]:
+        """Find the top_k components critical to the system architecture."""
+        nodes = self.kg.nodes
+        adjacency = self.kg.adjacency
+        reverse_adjacency = self.kg.reverse_adjacency
+        
+        # Single pass over every node with outgoing or incoming edges, yielding
+        # (position, node_id, dependency_count, dependent_count) for critical ones
+        def candidates():
+            for position, node_id in enumerate(dict.fromkeys(chain(adjacency, reverse_adjacency))):
+                dependency_count = len(adjacency.get(node_id, ()))
+                dependent_count = len(reverse_adjacency.get(node_id, ()))
+                if dependency_count > 5 or dependent_count > 5:  # Threshold for high dependency
+                    yield position, node_id, dependency_count, dependent_count
+        
+        top = heapq.nlargest(top_k, candidates(), key=lambda c: max(c[2], c[3]))
+        # Report the kept components in graph order, as before
+        top.sort(key=itemgetter(0))
+        
+        high_dependency = []
+        depended_upon = []
+        
+        for _, node_id, dependency_count, dependent_count in top:
+            name = nodes[node_id].name
+            
+            # High-dependency components
+            if dependency_count > 5:
+                high_dependency.append({
+                    'component': name,
                     'type': 'high_dependency',
-                    'dependency_count': len(neighbors),
-                    'risk': 'high' if len(neighbors) > 10 else 'medium'
+                    'dependency_count': dependency_count,
+                    'risk': 'high' if dependency_count > 10 else 'medium'
                 })
-        
-        # Highly depended-upon components
-        for node_id, dependents in self.kg.reverse_adjacency.items():
-            if len(dependents) > 5:
-                node = self.kg.nodes[node_id]
-                critical.append({
-                    'component': node.name,
+            
+            # Highly depended-upon components
+            if dependent_count > 5:
+                depended_upon.append({
+                    'component': name,
                     'type': 'highly_depended_upon',
-                    'dependent_count': len(dependents),
-                    'risk': 'high' if len(dependents) > 10 else 'medium'
+                    'dependent_count': dependent_count,
+                    'risk': 'high' if dependent_count > 10 else 'medium'
                 })
         
-        return critical
+        return high_dependency + depended_upon
     
     def suggest_optimizations(self) -> List[Dict[str, Any]]:
         """Suggest optimizations based on graph analysis."""
@@ -171,22 +304,18 @@ class EnhancedDependencyAnalyzer:
         impact = self.kg.get_impact_analysis(node_id)
         
         # Similar components
-        similar = self.kg.find_similar_components(node_id)
+        similar = self.kg.find_similar_components(node_id, k=3)
         
         # Dependency path analysis
         external_deps = [f"external:{dep['target']}" for dep in basic_deps.get('dependencies', []) 
                         if f"external:{dep['target']}" in self.kg.nodes]
         
-        paths_to_external = {}
-        for ext_dep in external_deps[:5]:  # Limit to first 5
-            path = self.kg.find_path(node_id, ext_dep)
-            if path:
-                paths_to_external[ext_dep] = path
+        paths_to_external = self.kg.find_paths_multi(node_id, external_deps[:5])  # Limit to first 5
         
         return {
             'basic_info': basic_deps,
             'impact_analysis': impact,
-            'similar_components': [(self.kg.nodes[s[0]].name, s[1]) for s in similar[:3]],
+            'similar_components': [(self.kg.nodes[s[0]].name, s[1]) for s in similar],
             'dependency_paths': paths_to_external,
             'architectural_role': self._determine_architectural_role(node_id)
         }
@@ -195,7 +324,10 @@ class EnhancedDependencyAnalyzer:
         """Get basic dependency information."""
         # Normalize path
         if file_path not in self.dependency_data['dependencies']:
-            matches = [f for f in self.dependency_data['dependencies'].keys() if f.endswith(file_path)]
+            matches = self._suffix_index.get(file_path)
+            if not matches:
+                # Suffixes that don't start at a path separator still need a scan
+                matches = [f for f in self.dependency_data['dependencies'].keys() if f.endswith(file_path)]
             if matches:
                 file_path = matches[0]
             else:
@@ -214,29 +346,16 @@ class EnhancedDependencyAnalyzer:
     def _determine_architectural_role(self, node_id: str) -> str:
         """Determine the architectural role of a component."""
         node = self.kg.nodes[node_id]
-        name_lower = node.name.lower()
-        
-        # Check for common patterns
-        roles = []
-        
-        if 'main' in name_lower or 'app' in name_lower:
-            roles.append('entry_point')
-        if 'controller' in name_lower or 'handler' in name_lower:
-            roles.append('controller')
-        if 'service' in name_lower or 'business' in name_lower:
-            roles.append('service')
-        if 'model' in name_lower or 'entity' in name_lower:
-            roles.append('model')
-        if 'util' in name_lower or 'helper' in name_lower:
-            roles.append('utility')
-        if 'config' in name_lower or 'setting' in name_lower:
-            roles.append('configuration')
-        if 'test' in name_lower:
-            roles.append('test')
+        
+        # Check for common patterns in a single regex scan of the name
+        matched = {m.lastindex for m in _ROLE_RE.finditer(node.name)}
+        roles = [role for group, role in enumerate(_ROLE_NAMES, 1) if group in matched]
         
         # Analyze connectivity patterns
-        incoming = len(self.kg.reverse_adjacency.get(node_id, []))
-        outgoing = len(self.kg.adjacency.get(node_id, []))
+        adjacency = self.kg.adjacency
+        reverse_adjacency = self.kg.reverse_adjacency
+        incoming = len(reverse_adjacency.get(node_id, []))
+        outgoing = len(adjacency.get(node_id, []))
         
         if incoming > outgoing * 2:
             roles.append('shared_utility')
@@ -266,56 +385,56 @@ def main():
     
     command = sys.argv[1]
     
+    lines: List[str] = []
+    
     if command == '--architecture':
-        print("🏗️  Architectural Analysis")
-        print("=" * 50)
+        lines.append("🏗️  Architectural Analysis")
+        lines.append("=" * 50)
         analysis = analyzer.analyze_architecture()
         
-        print(f"\n📋 Detected Patterns:")
+        lines.append(f"\n📋 Detected Patterns:")
         for pattern, components in analysis['architectural_patterns'].items():
-            print(f"  {pattern}: {len(components)} components")
+            lines.append(f"  {pattern}: {len(components)} components")
         
-        print(f"\n🔗 Dependency Clusters:")
+        lines.append(f"\n🔗 Dependency Clusters:")
         for i, cluster in enumerate(analysis['dependency_clusters'], 1):
-            print(f"  Cluster {i}: {len(cluster)} components")
+            lines.append(f"  Cluster {i}: {len(cluster)} components")
         
-        print(f"\n🚀 Detected Frameworks:")
+        lines.append(f"\n🚀 Detected Frameworks:")
         for framework, files in analysis['detected_frameworks'].items():
-            print(f"  {framework}: {len(files)} files")
+            lines.append(f"  {framework}: {len(files)} files")
     
     elif command == '--critical':
-        print("⚠️  Critical Components Analysis")
-        print("=" * 50)
+        lines.append("⚠️  Critical Components Analysis")
+        lines.append("=" * 50)
         critical = analyzer.find_critical_components()
         
         for comp in critical:
-            print(f"\n🔴 {comp['component']}")
-            print(f"   Type: {comp['type']}")
+            lines.append(f"\n🔴 {comp['component']}")
+            lines.append(f"   Type: {comp['type']}")
             if 'dependency_count' in comp:
-                print(f"   Dependencies: {comp['dependency_count']}")
+                lines.append(f"   Dependencies: {comp['dependency_count']}")
             if 'dependent_count' in comp:
-                print(f"   Dependents: {comp['dependent_count']}")
-            print(f"   Risk: {comp['risk']}")
+                lines.append(f"   Dependents: {comp['dependent_count']}")
+            lines.append(f"   Risk: {comp['risk']}")
     
     elif command == '--optimize':
-        print("💡 Optimization Suggestions")
-        print("=" * 50)
+        lines.append("💡 Optimization Suggestions")
+        lines.append("=" * 50)
         suggestions = analyzer.suggest_optimizations()
         
         for i, suggestion in enumerate(suggestions, 1):
-            print(f"\n{i}. {suggestion['type'].replace('_', ' ').title()}")
-            print(f"   {suggestion['description']}")
-            print(f"   💡 {suggestion['suggestion']}")
-            print(f"   Priority: {suggestion['priority']}")
+            lines.append(f"\n{i}. {suggestion['type'].replace('_', ' ').title()}")
+            lines.append(f"   {suggestion['description']}")
+            lines.append(f"   💡 {suggestion['suggestion']}")
+            lines.append(f"   Priority: {suggestion['priority']}")
     
     elif command == '--export':
         format_type = sys.argv[2] if len(sys.argv) > 2 else 'json'
-        output = analyzer.kg.export_graph(format_type)
-        
         filename = f"knowledge_graph.{format_type}"
         with open(filename, 'w') as f:
-            f.write(output)
-        print(f"📊 Knowledge graph exported to: {filename}")
+            analyzer.kg.export_graph(format_type, fp=f)
+        lines.append(f"📊 Knowledge graph exported to: {filename}")
     
     else:
         # Enhanced file query
@@ -326,26 +445,29 @@ def main():
             return
         
         basic = result['basic_info']
-        print(f"🔍 Enhanced Analysis: {basic['file_path']}")
-        print(f"📋 Language: {basic['language']}")
-        print(f"🔢 Symbols: {basic['symbols']}")
-        print(f"🏗️  Role: {result['architectural_role']}")
-        print("-" * 50)
+        lines.append(f"🔍 Enhanced Analysis: {basic['file_path']}")
+        lines.append(f"📋 Language: {basic['language']}")
+        lines.append(f"🔢 Symbols: {basic['symbols']}")
+        lines.append(f"🏗️  Role: {result['architectural_role']}")
+        lines.append("-" * 50)
         
-        print(f"\n📦 Dependencies ({len(basic['dependencies'])}):")
+        lines.append(f"\n📦 Dependencies ({len(basic['dependencies'])}):")
         for dep in basic['dependencies']:
-            print(f"   {dep['type']}: {dep['target']}")
+            lines.append(f"   {dep['type']}: {dep['target']}")
         
         impact = result['impact_analysis']
-        print(f"\n💥 Impact Analysis:")
-        print(f"   Direct dependents: {len(impact['direct_dependents'])}")
-        print(f"   Indirect dependents: {len(impact['indirect_dependents'])}")
-        print(f"   Risk level: {impact['risk_level']}")
+        lines.append(f"\n💥 Impact Analysis:")
+        lines.append(f"   Direct dependents: {len(impact['direct_dependents'])}")
+        lines.append(f"   Indirect dependents: {len(impact['indirect_dependents'])}")
+        lines.append(f"   Risk level: {impact['risk_level']}")
         
         if result['similar_components']:
-            print(f"\n🔗 Similar Components:")
+            lines.append(f"\n🔗 Similar Components:")
             for name, similarity in result['similar_components']:
-                print(f"   {name} (similarity: {similarity:.2f})")
+                lines.append(f"   {name} (similarity: {similarity:.2f})")
+    
+    # Emit the whole report with a single write
+    sys.stdout.write('\n'.join(lines) + '\n')
 
 
 if __name__ == "__main__":
@@ -22,19 +22,124 @@ import argparse
 import time
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Any, Set
+from typing import Dict, List, Any, Set, Tuple
 import logging
+from array import array
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# Optional fast JSON encoder
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Add the current directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from dependency_analyzer import DependencyAnalyzer
-from dependency_analyzer.types import Language, SymbolType
+from dependency_analyzer.types import Language, SymbolType, normalize_path
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 logger = logging.getLogger(__name__)
 
+# Console progress report. Messages use %-style arguments so formatting is
+# skipped entirely when the level is raised (--quick sets it to WARNING).
+report = logging.getLogger(f"{__name__}.report")
+_report_handler = logging.StreamHandler(sys.stdout)
+_report_handler.setFormatter(logging.Formatter('%(message)s'))
+report.addHandler(_report_handler)
+report.setLevel(logging.INFO)
+report.propagate = False
+
+# File types counted by quick_file_count (matched on the lowercased suffix)
+_SUPPORTED_EXTENSIONS = frozenset({
+    '.py', '.js', '.jsx', '.ts', '.tsx', '.java', '.cpp', '.c', '.h', '.hpp',
+    '.cs', '.go', '.rs', '.php', '.rb', '.swift', '.kt', '.scala',
+    '.json', '.yaml', '.yml', '.xml', '.toml', '.ini', '.env',
+    '.dockerfile', '.sql', '.css', '.html', '.vue', '.svelte',
+    '.md', '.rst', '.txt', '.cfg', '.conf', '.properties'
+})
+
+# Extensionless files recognised by name
+_SUPPORTED_FILENAMES = frozenset({'dockerfile', 'makefile'})
+
+# Directories never worth descending into
+_SKIP_DIRS = frozenset({
+    'node_modules', '__pycache__', '.git', 'venv', 'env', 'build',
+    'dist', 'target', 'bin', 'obj', '.idea', '.vs', 'logs', 'tmp'
+})
+
+# Threads used to scan directories concurrently in quick_file_count
+_SCAN_WORKERS = 8
+
+
+def _is_supported_file(file_name: str) -> bool:
+    """Check whether a file name has a supported extension or name."""
+    name = file_name.lower()
+    dot = name.rfind('.')
+    return (dot >= 0 and name[dot:] in _SUPPORTED_EXTENSIONS) or name in _SUPPORTED_FILENAMES
+
+
+def _scan_directory(directory: str) -> Tuple[int, List[str]]:
+    """Count supported files in one directory and list subdirectories to visit.
+    
+    os.scandir releases the GIL while reading the directory, so independent
+    subtrees can be scanned concurrently from a thread pool.
+    """
+    file_count = 0
+    subdirs = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if not entry.name.startswith('.') and entry.name not in _SKIP_DIRS:
+                        subdirs.append(entry.path)
+                elif _is_supported_file(entry.name):
+                    file_count += 1
+    except OSError:
+        pass
+    return file_count, subdirs
+
+
+def _build_dependency_maps(columns: Dict[str, Any], repository_path: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Build the per-file info map and dependency map saved to dependencies.json.
+    
+    This is the hot loop of the save phase (one dict per dependency edge), so
+    everything it touches is bound to locals up front.
+    """
+    relpath = os.path.relpath
+    # Files live under the (absolute) repository path, so stripping the
+    # prefix is equivalent to relpath without its normalisation work.
+    prefix = repository_path.rstrip(os.sep) + os.sep
+    prefix_len = len(prefix)
+    file_info_map = {}
+    dependency_map = {}
+    
+    for file_path, lang, n_symbols, n_deps, deps in zip(
+        columns['file_paths'], columns['langs'], columns['symbol_counts'],
+        columns['deps_counts'], columns['dependencies']
+    ):
+        if file_path.startswith(prefix):
+            rel_path = file_path[prefix_len:]
+        else:
+            rel_path = relpath(file_path, repository_path)
+        
+        # File dependencies (what this file needs)
+        dependency_map[rel_path] = [
+            {'target': dep.target_file, 'type': dep.dependency_type}
+            for dep in deps
+        ]
+        file_info_map[rel_path] = {
+            'language': lang,
+            'symbols': n_symbols,
+            'deps_count': n_deps
+        }
+    
+    return file_info_map, dependency_map
+
 
 class FastRepositoryAnalyzer:
     """High-performance repository analysis with optimizations."""
@@ -49,6 +154,9 @@ class FastRepositoryAnalyzer:
         # Performance tracking
         self.start_time = time.time()
         
+        # Per-file columns built lazily by _to_columnar()
+        self._columns = None
+        
         # Use fixed output directory (will clean and replace previous)
         self.output_base = "dependency_analysis"
         
@@ -72,113 +180,145 @@ class FastRepositoryAnalyzer:
         # Create minimal folder structure
         os.makedirs(self.output_base, exist_ok=True)
         
-        print(f"📁 Output: {self.output_base} (cleaned previous results)")
+        report.info("📁 Output: %s (cleaned previous results)", self.output_base)
     
     def quick_file_count(self) -> int:
         """Quick estimation of files to be analyzed."""
         file_count = 0
-        supported_extensions = {
-            '.py', '.js', '.jsx', '.ts', '.tsx', '.java', '.cpp', '.c', '.h', '.hpp',
-            '.cs', '.go', '.rs', '.php', '.rb', '.swift', '.kt', '.scala',
-            '.json', '.yaml', '.yml', '.xml', '.toml', '.ini', '.env',
-            '.dockerfile', '.sql', '.css', '.html', '.vue', '.svelte',
-            '.md', '.rst', '.txt', '.cfg', '.conf', '.properties'
-        }
         
-        try:
-            for root, dirs, files in os.walk(self.repository_path):
-                # Skip common large directories early
-                dirs[:] = [d for d in dirs if not d.startswith('.') and d not in {
-                    'node_modules', '__pycache__', '.git', 'venv', 'env', 'build', 
-                    'dist', 'target', 'bin', 'obj', '.idea', '.vs', 'logs', 'tmp'
-                }]
-                
-                for file in files:
-                    if any(file.lower().endswith(ext) for ext in supported_extensions):
-                        file_count += 1
-                        
-                # Stop counting after 10000 files for very large repos
-                if file_count > 10000:
-                    return 10000
+        with ThreadPoolExecutor(max_workers=_SCAN_WORKERS) as executor:
+            pending = {executor.submit(_scan_directory, self.repository_path)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    count, subdirs = future.result()
+                    file_count += count
+                    
+                    # Stop counting after 10000 files for very large repos
+                    if file_count > 10000:
+                        for other in pending:
+                            other.cancel()
+                        return 10000
                     
-        except (OSError, PermissionError):
-            pass
+                    pending.update(executor.submit(_scan_directory, d) for d in subdirs)
             
         return file_count
     
     def analyze_repository(self) -> bool:
         """Perform fast repository analysis."""
-        print(f"🚀 Fast Universal Dependency Analyzer")
-        print(f"📁 Repository: {self.repository_name}")
-        print(f"📍 Path: {self.repository_path}")
-        print(f"⏰ Started: {self.analysis_timestamp.strftime('%H:%M:%S')}")
+        report.info("🚀 Fast Universal Dependency Analyzer")
+        report.info("📁 Repository: %s", self.repository_name)
+        report.info("📍 Path: %s", self.repository_path)
+        report.info("⏰ Started: %02d:%02d:%02d", self.analysis_timestamp.hour,
+                    self.analysis_timestamp.minute, self.analysis_timestamp.second)
         
         if self.quick_mode:
-            print("⚡ Quick mode enabled - minimal output")
+            report.info("⚡ Quick mode enabled - minimal output")
         
-        print("-" * 60)
+        report.info("%s", "-" * 60)
         
         # Quick file count estimation
         estimated_files = self.quick_file_count()
-        print(f"📊 Estimated files to analyze: {estimated_files}")
+        report.info("📊 Estimated files to analyze: %d", estimated_files)
         
         if estimated_files > 1000:
-            print("⚠️  Large repository detected - this may take a few minutes")
+            report.warning("⚠️  Large repository detected - this may take a few minutes")
         
         # Initialize analyzer with progress tracking
         start_time = time.time()
         success = self.analyzer.initialize([self.repository_path])
+        self._columns = None
         init_time = time.time() - start_time
         
         if not success:
-            print("❌ Failed to initialize analyzer")
+            report.error("❌ Failed to initialize analyzer")
             return False
         
-        print(f"✅ Analysis completed in {init_time:.1f}s")
+        report.info("✅ Analysis completed in %.1fs", init_time)
         return True
     
+    def _to_columnar(self) -> Dict[str, Any]:
+        """Flatten the indexed files into parallel per-file columns.
+        
+        Index i of every column describes the same file, so aggregates are
+        single passes over flat lists instead of lookups into per-file objects.
+        The columns are cached until the next analyze_repository() call.
+        """
+        if self._columns is None:
+            files = self.analyzer.symbol_index.files
+            self._columns = self._columns_from(list(files), list(files.values()))
+        return self._columns
+    
+    @staticmethod
+    def _columns_from(file_paths: List[str], file_infos: List[Any]) -> Dict[str, Any]:
+        """Build the per-file columns for parallel lists of paths and FileInfo objects."""
+        return {
+            'file_paths': file_paths,
+            'langs': [file_info.language.value for file_info in file_infos],
+            'symbol_counts': array('i', [len(file_info.symbols) for file_info in file_infos]),
+            'deps_counts': array('i', [len(file_info.dependencies) for file_info in file_infos]),
+            'dependencies': [file_info.dependencies for file_info in file_infos],
+        }
+    
+    def reindex_files(self, file_paths: List[str]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Re-parse only the given files after analyze_repository().
+        
+        The symbol index is updated in place, so only the changed files are
+        read instead of walking the whole repository again. Returns the
+        (file_info_map, dependency_map) entries for the re-indexed files, keyed
+        by repository-relative path as in dependencies.json.
+        """
+        symbol_index = self.analyzer.symbol_index
+        indexed_paths = [
+            normalize_path(file_path) for file_path in file_paths
+            if symbol_index.index_file(file_path)
+        ]
+        self._columns = None
+        
+        files = symbol_index.files
+        columns = self._columns_from(indexed_paths, [files[path] for path in indexed_paths])
+        return _build_dependency_maps(columns, self.repository_path)
+    
     def generate_analysis_summary(self):
         """Generate fast analysis summary."""
-        print("\n📋 Analysis Summary")
-        print("-" * 30)
+        lines: List[str] = ["\n📋 Analysis Summary", "-" * 30]
         
         # Collect data efficiently
-        total_files = len(self.analyzer.symbol_index.files)
-        total_symbols = 0
-        total_deps = 0
-        language_stats = {}
-        symbol_type_stats = {}
-        
-        for file_path, file_info in self.analyzer.symbol_index.files.items():
-            total_symbols += len(file_info.symbols)
-            total_deps += len(file_info.dependencies)
-            
-            # Language stats
-            lang = file_info.language.value
-            if lang not in language_stats:
-                language_stats[lang] = {'files': 0, 'symbols': 0}
-            language_stats[lang]['files'] += 1
-            language_stats[lang]['symbols'] += len(file_info.symbols)
-            
-            # Symbol type stats (sample first 1000 symbols for large repos)
-            symbols_to_process = file_info.symbols[:1000] if len(file_info.symbols) > 1000 else file_info.symbols
-            for symbol in symbols_to_process:
-                sym_type = symbol.symbol_type.value
-                symbol_type_stats[sym_type] = symbol_type_stats.get(sym_type, 0) + 1
+        columns = self._to_columnar()
+        langs = columns['langs']
+        symbol_counts = columns['symbol_counts']
+        total_files = len(columns['file_paths'])
+        total_symbols = sum(symbol_counts)
+        total_deps = sum(columns['deps_counts'])
+        
+        # Language stats
+        lang_symbols = Counter()
+        for lang, n_symbols in zip(langs, symbol_counts):
+            lang_symbols[lang] += n_symbols
+        language_stats = {
+            lang: {'files': files, 'symbols': lang_symbols[lang]}
+            for lang, files in Counter(langs).items()
+        }
+        
+        # Symbol type stats (sample first 1000 symbols per file for large repos)
+        symbol_type_stats = Counter(
+            symbol.symbol_type.value
+            for file_info in self.analyzer.symbol_index.files.values()
+            for symbol in file_info.symbols[:1000]
+        )
         
         # Print results
-        print(f"📊 Files: {total_files}")
-        print(f"🔍 Symbols: {total_symbols:,}")
-        print(f"🔗 Dependencies: {total_deps}")
-        print(f"🌍 Languages: {len(language_stats)}")
+        lines.append(f"📊 Files: {total_files}")
+        lines.append(f"🔍 Symbols: {total_symbols:,}")
+        lines.append(f"🔗 Dependencies: {total_deps}")
+        lines.append(f"🌍 Languages: {len(language_stats)}")
         
         # Top languages
-        print(f"\n🏆 Top Languages:")
+        lines.append(f"\n🏆 Top Languages:")
         for lang, stats in sorted(language_stats.items(), key=lambda x: x[1]['files'], reverse=True)[:5]:
-            print(f"  {lang:<15} {stats['files']:>3} files  {stats['symbols']:>5} symbols")
+            lines.append(f"  {lang:<15} {stats['files']:>3} files  {stats['symbols']:>5} symbols")
         
         # Dependency analysis (quick sample)
-        dep_types = {}
         sample_deps = []
         count = 0
         for file_info in self.analyzer.symbol_index.files.values():
@@ -187,21 +327,22 @@ class FastRepositoryAnalyzer:
             if count > 1000:  # Limit for performance
                 break
         
-        for dep in sample_deps:
-            dep_type = dep.dependency_type
-            dep_types[dep_type] = dep_types.get(dep_type, 0) + 1
+        dep_types = Counter(dep.dependency_type for dep in sample_deps)
         
         if dep_types:
-            print(f"\n🔗 Top Dependencies:")
-            for dep_type, count in sorted(dep_types.items(), key=lambda x: x[1], reverse=True)[:5]:
-                print(f"  {dep_type:<20} {count:>3} relationships")
+            lines.append(f"\n🔗 Top Dependencies:")
+            for dep_type, count in dep_types.most_common(5):
+                lines.append(f"  {dep_type:<20} {count:>3} relationships")
         
         # Performance stats
         total_time = time.time() - self.start_time
-        print(f"\n⚡ Performance:")
-        print(f"  Analysis time: {total_time:.1f}s")
-        print(f"  Files/second: {total_files/total_time:.1f}")
-        print(f"  Symbols/second: {total_symbols/total_time:.0f}")
+        lines.append(f"\n⚡ Performance:")
+        lines.append(f"  Analysis time: {total_time:.1f}s")
+        lines.append(f"  Files/second: {total_files/total_time:.1f}")
+        lines.append(f"  Symbols/second: {total_symbols/total_time:.0f}")
+        
+        # Emit the whole summary with a single write
+        sys.stdout.write('\n'.join(lines) + '\n')
         
         # Save summary if not in quick mode
         if not self.quick_mode:
@@ -226,26 +367,7 @@ class FastRepositoryAnalyzer:
         deps_file = f"{self.output_base}/dependencies.json"
         
         # Build efficient dependency lookup structure
-        dependency_map = {}
-        file_info_map = {}
-        
-        for file_path, file_info in self.analyzer.symbol_index.files.items():
-            rel_path = os.path.relpath(file_path, self.repository_path)
-            
-            # File dependencies (what this file needs)
-            file_deps = []
-            for dep in file_info.dependencies:
-                file_deps.append({
-                    'target': dep.target_file,
-                    'type': dep.dependency_type
-                })
-            
-            dependency_map[rel_path] = file_deps
-            file_info_map[rel_path] = {
-                'language': file_info.language.value,
-                'symbols': len(file_info.symbols),
-                'deps_count': len(file_info.dependencies)
-            }
+        file_info_map, dependency_map = _build_dependency_maps(self._to_columnar(), self.repository_path)
         
         # Save compact essential data
         essential_data = {
@@ -255,11 +377,15 @@ class FastRepositoryAnalyzer:
             'dependencies': dependency_map
         }
         
-        with open(deps_file, 'w', encoding='utf-8') as f:
-            json.dump(essential_data, f, indent=2, ensure_ascii=False)
+        if ORJSON_AVAILABLE:
+            with open(deps_file, 'wb') as f:
+                f.write(orjson.dumps(essential_data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(deps_file, 'w', encoding='utf-8') as f:
+                json.dump(essential_data, f, indent=2, ensure_ascii=False)
         
-        print(f"\n💾 Essential data saved: {deps_file}")
-        print(f"   📋 {len(dependency_map)} files with dependency mappings")
+        report.info("\n💾 Essential data saved: %s", deps_file)
+        report.info("   📋 %d files with dependency mappings", len(dependency_map))
 
 
 def main():
@@ -299,6 +425,7 @@ Examples:
         logging.getLogger().setLevel(logging.DEBUG)
     elif args.quick:
         logging.getLogger().setLevel(logging.WARNING)
+        report.setLevel(logging.WARNING)
     
     try:
         # Create and run fast analysis
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Python File Runner
+
+Runs repository files as scripts for runtime verification, the way
+`python file.py` would from the file's directory, without paying for a fresh
+interpreter start-up per file:
+- Runner processes start once (one per concurrent caller), preload commonly
+  imported standard library modules and then serve requests over a pipe
+- Each file runs in its own child forked from a runner, so files stay
+  isolated from each other and from the agent
+- Files next to a module that shadows one the runner has already imported
+  run in a fresh subprocess, where the local module wins as it would normally
+- Platforms without fork (e.g. Windows) fall back to one subprocess per file
+
+Usage (started by run_python_file):
+    python file_runner.py --serve
+"""
+
+import io
+import os
+import gc
+import sys
+import json
+import math
+import time
+import types
+import atexit
+import signal
+import tempfile
+import threading
+import traceback
+import subprocess
+import importlib.machinery
+from typing import List, Optional, Set, Tuple
+
+# Standard library modules imported once by each runner so that files
+# importing them start faster
+_PRELOAD_MODULES = [
+    'json', 're', 'logging', 'collections', 'dataclasses', 'datetime',
+    'pathlib', 'typing', 'argparse', 'asyncio'
+]
+
+# Most bytes of output kept from a run. Output goes to temp files, not
+# memory; stdout keeps its start and stderr its end, where a traceback is
+_OUTPUT_LIMIT = 64 * 1024
+
+# Seconds a run that has already failed (e.g. its main thread raised) gets to
+# finish on its own before it is ended, instead of waiting out the timeout
+_FAST_FAIL_GRACE = 1.0
+
+FORK_AVAILABLE = hasattr(os, 'fork') and hasattr(signal, 'SIGALRM')
+
+# Runner processes not currently serving a request
+_idle_runners: List[subprocess.Popen] = []
+_runners_lock = threading.Lock()
+
+
+def _read_output(f, keep_end: bool) -> str:
+    """Read at most _OUTPUT_LIMIT bytes of the output captured in temp file f."""
+    size = f.seek(0, os.SEEK_END)
+    f.seek(max(0, size - _OUTPUT_LIMIT) if keep_end else 0)
+    return f.read(_OUTPUT_LIMIT).decode('utf-8', errors='replace')
+
+
+def _local_module_names(directory: str) -> Set[str]:
+    """Names of the modules and regular packages directly inside directory."""
+    suffixes = importlib.machinery.all_suffixes()
+    names = set()
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if os.path.isfile(os.path.join(entry.path, '__init__.py')):
+                        names.add(entry.name)
+                else:
+                    for suffix in suffixes:
+                        if entry.name.endswith(suffix):
+                            names.add(entry.name[:-len(suffix)].partition('.')[0])
+                            break
+    except OSError:
+        pass
+    return names
+
+
+def _finalize_child(thread_timeout: Optional[float] = None) -> None:
+    """
+    Finish a run the way interpreter shutdown would: wait for threads, run
+    atexit handlers, close files. With thread_timeout, threads still running
+    after that many seconds are abandoned to os._exit.
+    """
+    # The interpreter waits for non-daemon threads before exiting
+    deadline = None if thread_timeout is None else time.monotonic() + thread_timeout
+    for thread in threading.enumerate():
+        if thread is not threading.main_thread() and not thread.daemon:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+    
+    atexit._run_exitfuncs()
+    
+    # Files the script left open are flushed when finalization frees them;
+    # close text layers, then buffers, then the raw files beneath them
+    std_streams = set()
+    for stream in (sys.stdin, sys.stdout, sys.stderr, sys.__stdin__, sys.__stdout__, sys.__stderr__):
+        while stream is not None:
+            std_streams.add(id(stream))
+            stream = getattr(stream, 'buffer', None) or getattr(stream, 'raw', None)
+    open_files = [
+        obj for obj in gc.get_objects()
+        if isinstance(obj, io.IOBase) and id(obj) not in std_streams
+    ]
+    open_files.sort(key=lambda f: 0 if isinstance(f, io.TextIOBase) else 1 if isinstance(f, io.BufferedIOBase) else 2)
+    for f in open_files:
+        try:
+            f.close()
+        except Exception:
+            pass
+
+
+def _run_child(file_path: str, stdout_fd: int, stderr_fd: int) -> None:
+    """In a child forked from a runner: run file_path as __main__ from its directory, then exit."""
+    returncode = 1
+    raised = False
+    try:
+        # Only the script's own exit handlers should run
+        atexit._clear()
+        signal.signal(signal.SIGALRM, signal.SIG_DFL)
+        os.dup2(os.open(os.devnull, os.O_RDONLY), 0)
+        os.dup2(stdout_fd, 1)
+        os.dup2(stderr_fd, 2)
+        sys.stdin = open(0, closefd=False)
+        
+        file_dir = os.path.dirname(file_path)
+        os.chdir(file_dir)
+        sys.path[0] = file_dir
+        sys.argv = [os.path.basename(file_path)]
+        main_module = types.ModuleType('__main__')
+        main_module.__file__ = file_path
+        sys.modules['__main__'] = main_module
+        
+        with open(file_path, 'rb') as f:
+            code = compile(f.read(), file_path, 'exec')
+        exec(code, main_module.__dict__)
+        returncode = 0
+    except SystemExit as e:
+        if e.code is None:
+            returncode = 0
+        elif isinstance(e.code, int):
+            returncode = e.code
+        else:
+            print(e.code, file=sys.stderr)
+    except BaseException as e:
+        raised = True
+        # Report the traceback from the file's own frames, as the interpreter would
+        tb = e.__traceback__
+        while tb is not None and tb.tb_frame.f_code.co_filename != file_path:
+            tb = tb.tb_next
+        traceback.print_exception(type(e), e, tb or e.__traceback__)
+    finally:
+        try:
+            # A file that already failed is not kept alive by its threads
+            _finalize_child(_FAST_FAIL_GRACE if raised else None)
+        except BaseException:
+            traceback.print_exc()
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except Exception:
+                pass
+        os._exit(returncode)
+
+
+def _serve() -> None:
+    """Runner loop: read one JSON request per line from stdin, reply with one JSON result per line."""
+    for module_name in _PRELOAD_MODULES:
+        __import__(module_name)
+    loaded = {name.partition('.')[0] for name in sys.modules}
+    
+    requests = sys.stdin.buffer
+    replies = sys.stdout.buffer
+    
+    # A pending alarm kills the running child once its timeout has passed
+    child_pid = 0
+    timed_out = False
+    
+    def on_alarm(signum, frame):
+        nonlocal timed_out
+        timed_out = True
+        try:
+            os.kill(child_pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    
+    signal.signal(signal.SIGALRM, on_alarm)
+    
+    for line in requests:
+        request = json.loads(line)
+        
+        # A local module named like one already loaded here would be
+        # shadowed by it, unlike in a fresh interpreter
+        if not loaded.isdisjoint(_local_module_names(os.path.dirname(request['path']))):
+            replies.write(b'{"shadowed": true}\n')
+            replies.flush()
+            continue
+        
+        with tempfile.TemporaryFile() as stdout, tempfile.TemporaryFile() as stderr:
+            timed_out = False
+            child_pid = os.fork()
+            if child_pid == 0:
+                _run_child(request['path'], stdout.fileno(), stderr.fileno())
+            
+            signal.alarm(request['timeout'])
+            _, status = os.waitpid(child_pid, 0)
+            signal.alarm(0)
+            
+            reply = {
+                'returncode': os.waitstatus_to_exitcode(status),
+                'stdout': _read_output(stdout, keep_end=False),
+                'stderr': _read_output(stderr, keep_end=True),
+                'timed_out': timed_out
+            }
+        replies.write(json.dumps(reply).encode('utf-8') + b'\n')
+        replies.flush()
+
+
+def _acquire_runner() -> subprocess.Popen:
+    """Take an idle runner process, or start a new one if none is idle."""
+    with _runners_lock:
+        while _idle_runners:
+            runner = _idle_runners.pop()
+            if runner.poll() is None:
+                return runner
+    return subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), '--serve'],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE
+    )
+
+
+def _release_runner(runner: subprocess.Popen) -> None:
+    """Return a runner that finished its request to the idle list."""
+    with _runners_lock:
+        _idle_runners.append(runner)
+
+
+@atexit.register
+def _stop_runners() -> None:
+    """Close idle runners' request pipes; each exits when its input ends."""
+    with _runners_lock:
+        runners = _idle_runners[:]
+        _idle_runners.clear()
+    for runner in runners:
+        try:
+            runner.stdin.close()
+            runner.wait(timeout=1)
+        except (OSError, subprocess.TimeoutExpired):
+            runner.kill()
+
+
+def _run_in_runner(file_path: str, timeout: float) -> Optional[Tuple[int, str, str]]:
+    """Run file_path in a child of a runner process; returns None if the runner failed or declined."""
+    runner = _acquire_runner()
+    try:
+        request = {'path': file_path, 'timeout': max(1, math.ceil(timeout))}
+        runner.stdin.write(json.dumps(request).encode('utf-8') + b'\n')
+        runner.stdin.flush()
+        reply = runner.stdout.readline()
+    except OSError:
+        reply = b''
+    
+    if not reply:
+        runner.kill()
+        runner.wait()
+        return None
+    _release_runner(runner)
+    
+    result = json.loads(reply)
+    if result.get('shadowed'):
+        return None
+    if result['timed_out']:
+        raise subprocess.TimeoutExpired([file_path], timeout, output=result['stdout'], stderr=result['stderr'])
+    return result['returncode'], result['stdout'], result['stderr']
+
+
+def run_python_file(file_path: str, timeout: float = 10) -> Tuple[int, str, str]:
+    """
+    Run an absolute file_path like `python file.py` from its directory.
+    
+    Returns (returncode, stdout, stderr), each output capped at _OUTPUT_LIMIT
+    bytes, and raises subprocess.TimeoutExpired if the file runs longer than
+    timeout seconds (rounded up to whole seconds when a runner process is used);
+    its output and stderr hold what the file wrote before it was killed.
+    """
+    if FORK_AVAILABLE:
+        result = _run_in_runner(file_path, timeout)
+        if result is not None:
+            return result
+    
+    with tempfile.TemporaryFile() as stdout, tempfile.TemporaryFile() as stderr:
+        try:
+            result = subprocess.run(
+                [sys.executable, os.path.basename(file_path)],
+                stdout=stdout,
+                stderr=stderr,
+                timeout=timeout,
+                cwd=os.path.dirname(file_path)
+            )
+        except subprocess.TimeoutExpired as e:
+            e.output = _read_output(stdout, keep_end=False)
+            e.stderr = _read_output(stderr, keep_end=True)
+            raise
+        return result.returncode, _read_output(stdout, keep_end=False), _read_output(stderr, keep_end=True)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ['--serve']:
+        _serve()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Python File Walk
+
+Finds the Python files of a repository for the agents, visiting them in the
+same order as os.walk while skipping hidden entries and tool directories.
+"""
+
+import os
+from typing import AbstractSet, Iterator
+
+# Vendored, build and cache directories never searched for Python files;
+# hidden directories (.git, .venv, .tox, ...) are always skipped
+PRUNE_DIRS = frozenset({'__pycache__', 'node_modules', 'venv', 'build', 'dist'})
+
+
+def iter_python_files(root: str, prune: AbstractSet[str] = PRUNE_DIRS) -> Iterator[os.DirEntry]:
+    """
+    Yield a DirEntry for each .py file under root, depth-first in os.walk order.
+    
+    Hidden entries, directories named in prune and symlinked directories are
+    skipped; DirEntry answers is_dir without another stat, and unreadable
+    directories are passed over.
+    """
+    pending = [root]
+    while pending:
+        subdirs = []
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if name.startswith('.'):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        if name not in prune:
+                            subdirs.append(entry.path)
+                    elif name.endswith('.py'):
+                        yield entry
+        except OSError:
+            continue
+        pending.extend(reversed(subdirs))
@@ -7,33 +7,184 @@ intelligent repair plans before attempting fixes.
 """
 
 import os
+import re
 import logging
-from typing import List, Dict, Any, Tuple, Optional
+import functools
+import heapq
+import math
+from typing import List, Dict, Any, Tuple, Optional, Set
 from dataclasses import dataclass, field
-from enum import Enum
+from enum import IntEnum
 import json
+import gzip
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from operator import attrgetter, itemgetter
+
+from agents.file_walk import iter_python_files
+
+# Optional fast JSON encoder
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
-class IssueSeverity(Enum):
-    """Issue severity levels for prioritization"""
-    CRITICAL = "critical"      # Breaks execution (syntax, runtime errors)
-    HIGH = "high"             # Major functionality issues 
-    MEDIUM = "medium"         # Performance, maintainability issues
-    LOW = "low"               # Cosmetic, style issues
+class IssueSeverity(IntEnum):
+    """Issue severity levels for prioritization (lower value = more severe)"""
+    CRITICAL = 0      # Breaks execution (syntax, runtime errors)
+    HIGH = 1          # Major functionality issues 
+    MEDIUM = 2        # Performance, maintainability issues
+    LOW = 3           # Cosmetic, style issues
+    
+    def __str__(self) -> str:
+        return self.name.lower()
 
-class IssueCategory(Enum):
+class IssueCategory(IntEnum):
     """Categories of issues for targeted fixing strategies"""
-    SYNTAX_ERROR = "syntax_error"
-    RUNTIME_ERROR = "runtime_error" 
-    IMPORT_ERROR = "import_error"
-    TYPE_ERROR = "type_error"
-    PERFORMANCE = "performance"
-    SECURITY = "security"
-    STYLE = "style"
+    SYNTAX_ERROR = 0
+    RUNTIME_ERROR = 1
+    IMPORT_ERROR = 2
+    TYPE_ERROR = 3
+    PERFORMANCE = 4
+    SECURITY = 5
+    STYLE = 6
+    
+    def __str__(self) -> str:
+        return self.name.lower()
+
+# Log success probability of a single task by estimated complexity
+_LOG_COMPLEXITY_PROBABILITY = {
+    "Low": math.log(0.9),
+    "Medium": math.log(0.75),
+    "High": math.log(0.6)
+}
+_LOG_DEFAULT_PROBABILITY = math.log(0.7)
+
+# Longest issue description included in the AI classification prompt
+_PROMPT_DESCRIPTION_LIMIT = 200
+
+# Most repository analyses kept by one planning agent
+_ANALYSIS_CACHE_SIZE = 8
+
+class RawJSON:
+    """
+    Already-serialized JSON spliced verbatim into an exported plan.
+    
+    Producers that hold a field as a JSON document (e.g. metadata from another
+    agent) wrap it instead of parsing it only for export_plan to re-encode it.
+    """
+    __slots__ = ('raw',)
+    
+    def __init__(self, raw):
+        self.raw = raw.encode('utf-8') if isinstance(raw, str) else bytes(raw)
+    
+    def __repr__(self):
+        return f"RawJSON({self.raw!r})"
+
+def _json_default(value: Any) -> Any:
+    """Serialize values the stdlib encoder does not handle (datetimes)."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
 
-@dataclass
+def _json_encoder(pretty: bool):
+    """
+    Return a callable encoding one value to UTF-8 JSON bytes.
+    
+    Values are encoded in one call to orjson or the stdlib encoder. RawJSON
+    values are only noticed by the encoder's default hook, so containers that
+    hold one are re-encoded piecewise with the raw bytes spliced in.
+    """
+    raw_seen = []
+    
+    def default(value):
+        if isinstance(value, RawJSON):
+            raw_seen.append(value)
+            return None
+        return _json_default(value)
+    
+    if ORJSON_AVAILABLE:
+        dumps = functools.partial(orjson.dumps, default=default, option=orjson.OPT_INDENT_2 if pretty else 0)
+    else:
+        if pretty:
+            stdlib_encode = json.JSONEncoder(indent=2, default=default).encode
+        else:
+            stdlib_encode = json.JSONEncoder(separators=(',', ':'), default=default).encode
+        dumps = lambda value: stdlib_encode(value).encode('utf-8')
+    
+    key_separator = b': ' if pretty else b':'
+    
+    def splice(value):
+        if isinstance(value, RawJSON):
+            return value.raw
+        if isinstance(value, dict):
+            brackets = b'{}'
+            parts = [dumps(key) + key_separator + splice(item) for key, item in value.items()]
+        elif isinstance(value, (list, tuple)):
+            brackets = b'[]'
+            parts = [splice(item) for item in value]
+        else:
+            return dumps(value)
+        if not parts:
+            return brackets
+        if pretty:
+            body = b',\n  '.join(part.replace(b'\n', b'\n  ') for part in parts)
+            return brackets[:1] + b'\n  ' + body + b'\n' + brackets[1:]
+        return brackets[:1] + b','.join(parts) + brackets[1:]
+    
+    def encode(value):
+        data = dumps(value)
+        if raw_seen:
+            raw_seen.clear()
+            data = splice(value)
+        return data
+    
+    return encode
+
+# Issue keywords for _classify_issue_type_and_severity, in priority order
+_KEYWORD_CLASSIFICATIONS = (
+    # Critical issues that break execution
+    (IssueCategory.SYNTAX_ERROR, IssueSeverity.CRITICAL, ('syntax error', 'syntaxerror', 'was never closed')),
+    (IssueCategory.RUNTIME_ERROR, IssueSeverity.CRITICAL, ('nameerror', 'attributeerror', 'runtime error')),
+    (IssueCategory.IMPORT_ERROR, IssueSeverity.CRITICAL, ('importerror', 'modulenotfounderror')),
+    (IssueCategory.TYPE_ERROR, IssueSeverity.HIGH, ('typeerror', 'type error')),
+    # Performance and style issues
+    (IssueCategory.PERFORMANCE, IssueSeverity.MEDIUM, ('performance', 'inefficient', 'blocking')),
+    (IssueCategory.STYLE, IssueSeverity.LOW, ('print statement', 'debug', 'cosmetic')),
+)
+
+# One capture group per row above, so group N maps to _CLASSIFICATIONS[N-1]. The
+# lookahead makes finditer report overlapping keywords at every position.
+_CLASSIFIER_RE = re.compile(
+    '(?=' + '|'.join(
+        '(' + '|'.join(map(re.escape, keywords)) + ')'
+        for _, _, keywords in _KEYWORD_CLASSIFICATIONS
+    ) + ')',
+    re.IGNORECASE
+)
+_CLASSIFICATIONS = tuple((category, severity) for category, severity, _ in _KEYWORD_CLASSIFICATIONS)
+
+@functools.lru_cache(maxsize=4096)
+def _classify_description(description: str) -> Tuple[IssueCategory, IssueSeverity]:
+    """Classify an issue description; cached since linters repeat the same messages."""
+    # Keep the highest-priority (lowest numbered) keyword group found anywhere
+    best = None
+    for match in _CLASSIFIER_RE.finditer(description):
+        if best is None or match.lastindex < best:
+            best = match.lastindex
+            if best == 1:
+                break
+    
+    if best is None:
+        # Default classification
+        return IssueCategory.RUNTIME_ERROR, IssueSeverity.MEDIUM
+    return _CLASSIFICATIONS[best - 1]
+
+@dataclass(slots=True)
 class Issue:
     """Represents a single code issue"""
     file_path: str
@@ -44,7 +195,7 @@ class Issue:
     suggested_fix: str = ""
     dependencies: List[str] = field(default_factory=list)
     
-@dataclass 
+@dataclass(slots=True)
 class RepairTask:
     """Represents a planned repair task"""
     task_id: str
@@ -55,8 +206,33 @@ class RepairTask:
     estimated_complexity: str
     prerequisites: List[str] = field(default_factory=list)
     expected_outcome: str = ""
+    completed: bool = False
+    issues_count: int = field(init=False, repr=False, compare=False)  # len(issues_to_fix)
+    
+    # Fields written by export_plan, in output order (class attributes, not fields)
+    _EXPORT_FIELDS = (
+        'task_id', 'target_files', 'strategy', 'priority',
+        'estimated_complexity', 'prerequisites', 'expected_outcome', 'issues_count'
+    )
+    _export_values = attrgetter(*_EXPORT_FIELDS)
+    
+    def __post_init__(self):
+        # Tasks are built with their final issue list; refresh this if it is replaced
+        self.issues_count = len(self.issues_to_fix)
+    
+    def to_json_dict(self) -> Dict[str, Any]:
+        """Return the exported view of this task as a JSON-serializable dict."""
+        return dict(zip(self._EXPORT_FIELDS, self._export_values(self)))
+    
+    @classmethod
+    def to_json_columns(cls, tasks: List['RepairTask']) -> Dict[str, List[Any]]:
+        """Return the exported view of tasks as one list per field, in task order."""
+        rows = list(map(cls._export_values, tasks))
+        if rows:
+            return dict(zip(cls._EXPORT_FIELDS, map(list, zip(*rows))))
+        return {name: [] for name in cls._EXPORT_FIELDS}
 
-@dataclass
+@dataclass(slots=True)
 class RepairPlan:
     """Complete strategic plan for repository healing"""
     plan_id: str
@@ -68,6 +244,71 @@ class RepairPlan:
     estimated_duration: str
     success_probability: float
     created_at: datetime = field(default_factory=datetime.now)
+    created_at_iso: str = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # created_at is fixed once the plan exists, so format it only once
+        self.created_at_iso = self.created_at.isoformat()
+    
+    def to_json_dict(self, columnar: bool = False) -> Dict[str, Any]:
+        """
+        Return the exported view of this plan as a JSON-serializable dict.
+        
+        Tasks are listed as one object each, or with columnar=True as a single
+        "tasks_columns" object holding one list per field.
+        """
+        plan_dict = {
+            'plan_id': self.plan_id,
+            'repository_path': self.repository_path,
+            'total_issues': self.total_issues,
+            'estimated_duration': self.estimated_duration,
+            'success_probability': self.success_probability,
+            'created_at': self.created_at_iso,
+            'critical_path': self.critical_path,
+            'dependency_order': self.dependency_order,
+        }
+        if columnar:
+            plan_dict['tasks_columns'] = RepairTask.to_json_columns(self.tasks)
+        else:
+            plan_dict['tasks'] = list(map(RepairTask.to_json_dict, self.tasks))
+        return plan_dict
+    
+    def to_json_bytes(self, pretty: bool = False, columnar: bool = False) -> bytes:
+        """
+        Serialize this plan to UTF-8 JSON bytes.
+        
+        The whole document is encoded in one call, so orjson (or the stdlib C
+        encoder) fills a single buffer instead of chunks being joined afterwards.
+        """
+        return _json_encoder(pretty)(self.to_json_dict(columnar))
+
+def _inspect_file(file_path: str, file_info: Dict[str, Any]) -> Tuple[str, bool, int, Any]:
+    """
+    Inspect one Python file's dependency record.
+    
+    Returns (basename, is_entry_point, complexity, imports).
+    """
+    basename = os.path.basename(file_path)
+    is_entry_point = False
+    
+    # Identify entry points (main files, files with if __name__ == "__main__")
+    symbols = file_info.get('symbols', [])
+    
+    # Handle case where symbols might be an integer count instead of list
+    if isinstance(symbols, int):
+        # symbols is just a count, use it for complexity but can't iterate
+        complexity = symbols
+        # Check if filename suggests it's an entry point
+        is_entry_point = basename in ['main.py', 'app.py', 'run.py', '__main__.py']
+    elif isinstance(symbols, list):
+        # symbols is a list, we can iterate
+        is_entry_point = any(s.get('name') == 'main' for s in symbols if isinstance(s, dict))
+        complexity = len(symbols)
+    else:
+        # Unknown type, default to 0
+        complexity = 0
+    
+    return basename, is_entry_point, complexity, file_info.get('imports', [])
 
 class StrategicPlanningAgent:
     """
@@ -80,6 +321,14 @@ class StrategicPlanningAgent:
         self.analyzer = analyzer
         self.genai_client = genai_client
         self.current_plan: Optional[RepairPlan] = None
+        self._tasks_by_id: Dict[str, RepairTask] = {}
+        self._completed: Set[str] = set()
+        self._analysis_cache: Dict[Tuple[str, int], Tuple[Any, Any, int, Dict[str, Any]]] = {}
+        # Serialized bytes of the last exported plan object, with the
+        # (pretty, columnar) options they were encoded with
+        self._export_plan: Optional[RepairPlan] = None
+        self._export_options: Optional[Tuple[bool, bool]] = None
+        self._export_cache: bytes = b''
         
     def create_repair_plan(
         self, 
@@ -103,7 +352,7 @@ class StrategicPlanningAgent:
         try:
             # Step 1: Analyze repository structure and dependencies
             logger.info("📊 Analyzing repository structure...")
-            repo_analysis = self._analyze_repository_structure(repository_path)
+            repo_analysis = self._get_repository_analysis(repository_path)
             
             # Step 2: Classify and prioritize all detected issues
             logger.info("🔍 Classifying issues...")
@@ -127,9 +376,7 @@ class StrategicPlanningAgent:
             estimated_duration = self._estimate_duration(repair_tasks)
             
         except Exception as e:
-            logger.error(f"❌ Error in planning step: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"❌ Error in planning step: {e}")
             raise
         
         # Create the comprehensive plan
@@ -145,10 +392,46 @@ class StrategicPlanningAgent:
         )
         
         self.current_plan = plan
-        self._log_plan_summary(plan)
+        self._tasks_by_id = {task.task_id: task for task in plan.tasks}
+        self._completed = set()
+        self._export_plan = None
+        self._export_cache = b''
+        self._log_plan_summary(plan, repo_analysis.get('basenames'))
         
         return plan
     
+    def _get_repository_analysis(self, repository_path: str) -> Dict[str, Any]:
+        """
+        Return the repository analysis, reusing it while the analyzer data is unchanged.
+        
+        An analysis is reused only for the same analyzer, dependency data
+        object and data_version, which the analyzer bumps on every load or
+        in-place update. The filesystem scan used without analyzer data is
+        never cached, so new files are always seen.
+        """
+        analyzer = self.analyzer
+        dependency_data = analyzer.dependency_data if analyzer else None
+        if not dependency_data:
+            return self._analyze_repository_structure(repository_path)
+        
+        key = (repository_path, id(analyzer))
+        version = getattr(analyzer, 'data_version', 0)
+        
+        # The cached entry pins the analyzer and data objects, so a matching
+        # identity check guards against id() reuse
+        cached = self._analysis_cache.get(key)
+        if (cached is not None and cached[0] is analyzer and cached[1] is dependency_data
+                and cached[2] == version):
+            logger.info("♻️ Reusing cached repository analysis")
+            return cached[3]
+        
+        analysis = self._analyze_repository_structure(repository_path)
+        self._analysis_cache.pop(key, None)
+        if len(self._analysis_cache) >= _ANALYSIS_CACHE_SIZE:
+            del self._analysis_cache[next(iter(self._analysis_cache))]
+        self._analysis_cache[key] = (analyzer, dependency_data, version, analysis)
+        return analysis
+    
     def _analyze_repository_structure(self, repository_path: str) -> Dict[str, Any]:
         """Analyze repository structure using knowledge graph and indexing."""
         logger.info("📊 Analyzing repository structure...")
@@ -161,6 +444,8 @@ class StrategicPlanningAgent:
             'dependency_map': {},
             'complexity_scores': {},
             'import_graph': {},
+            'basenames': {},
+            'stems': {},
         }
         
         if not self.analyzer or not self.analyzer.dependency_data:
@@ -171,33 +456,22 @@ class StrategicPlanningAgent:
         files_data = self.analyzer.dependency_data.get('files', {})
         analysis['total_files'] = len(files_data)
         
-        for file_path, file_info in files_data.items():
-            if file_path.endswith('.py'):
-                analysis['python_files'].append(file_path)
-                
-                # Identify entry points (main files, files with if __name__ == "__main__")
-                symbols = file_info.get('symbols', [])
-                
-                # Handle case where symbols might be an integer count instead of list
-                if isinstance(symbols, int):
-                    # symbols is just a count, use it for complexity but can't iterate
-                    analysis['complexity_scores'][file_path] = symbols
-                    # Check if filename suggests it's an entry point
-                    if os.path.basename(file_path) in ['main.py', 'app.py', 'run.py', '__main__.py']:
-                        analysis['entry_points'].append(file_path)
-                elif isinstance(symbols, list):
-                    # symbols is a list, we can iterate
-                    if any(s.get('name') == 'main' for s in symbols if isinstance(s, dict)):
-                        analysis['entry_points'].append(file_path)
-                    analysis['complexity_scores'][file_path] = len(symbols)
-                else:
-                    # Unknown type, default to 0
-                    analysis['complexity_scores'][file_path] = 0
-                
-                # Build import graph
-                imports = file_info.get('imports', [])
-                if imports:
-                    analysis['import_graph'][file_path] = imports
+        python_files = [file_path for file_path in files_data if file_path.endswith('.py')]
+        file_infos = [files_data[file_path] for file_path in python_files]
+        
+        inspected = map(_inspect_file, python_files, file_infos)
+        for file_path, (basename, is_entry_point, complexity, imports) in zip(python_files, inspected):
+            analysis['python_files'].append(file_path)
+            analysis['basenames'][file_path] = basename
+            analysis['complexity_scores'][file_path] = complexity
+            if is_entry_point:
+                analysis['entry_points'].append(file_path)
+            
+            # Build import graph
+            if imports:
+                analysis['import_graph'][file_path] = imports
+        
+        analysis['stems'] = self._stems_from_basenames(analysis['basenames'])
         
         # Use knowledge graph if available
         if self.analyzer.kg:
@@ -215,21 +489,31 @@ class StrategicPlanningAgent:
             'dependency_map': {},
             'complexity_scores': {},
             'import_graph': {},
+            'basenames': {},
+            'stems': {},
         }
         
-        for root, dirs, files in os.walk(repository_path):
-            for file in files:
-                if file.endswith('.py') and not file.startswith('.'):
-                    file_path = os.path.join(root, file)
-                    analysis['python_files'].append(file_path)
-                    
-                    # Simple heuristics for entry points
-                    if file in ['main.py', 'app.py', 'run.py', '__main__.py']:
-                        analysis['entry_points'].append(file_path)
+        # Same file order as os.walk, skipping hidden, vendored and build
+        # directories entirely
+        for entry in iter_python_files(repository_path):
+            name = entry.name
+            file_path = entry.path
+            analysis['python_files'].append(file_path)
+            analysis['basenames'][file_path] = name
+            
+            # Simple heuristics for entry points
+            if name in ['main.py', 'app.py', 'run.py', '__main__.py']:
+                analysis['entry_points'].append(file_path)
         
         analysis['total_files'] = len(analysis['python_files'])
+        analysis['stems'] = self._stems_from_basenames(analysis['basenames'])
         return analysis
     
+    @staticmethod
+    def _stems_from_basenames(basenames: Dict[str, str]) -> Dict[str, str]:
+        """Map each file path to its module name (basename without extension)."""
+        return {path: os.path.splitext(basename)[0] for path, basename in basenames.items()}
+    
     def _classify_issues(self, detected_issues: List[Dict], description: str) -> List[Issue]:
         """Classify and prioritize detected issues using AI analysis."""
         logger.info("🔍 Classifying and prioritizing issues...")
@@ -267,7 +551,8 @@ class StrategicPlanningAgent:
             classified_issues = self._ai_enhance_classification(classified_issues, description)
         
         # Sort by severity and impact
-        classified_issues.sort(key=lambda x: (x.severity.value, x.issue_type.value))
+        # Most severe first, then by category (both are integer enums)
+        classified_issues.sort(key=attrgetter('severity', 'issue_type'))
         
         return classified_issues
     
@@ -294,30 +579,7 @@ class StrategicPlanningAgent:
     
     def _classify_issue_type_and_severity(self, description: str) -> Tuple[IssueCategory, IssueSeverity]:
         """Classify issue type and severity based on description."""
-        desc_lower = description.lower()
-        
-        # Critical issues that break execution
-        if any(keyword in desc_lower for keyword in ['syntax error', 'syntaxerror', 'was never closed']):
-            return IssueCategory.SYNTAX_ERROR, IssueSeverity.CRITICAL
-        
-        if any(keyword in desc_lower for keyword in ['nameerror', 'attributeerror', 'runtime error']):
-            return IssueCategory.RUNTIME_ERROR, IssueSeverity.CRITICAL
-            
-        if any(keyword in desc_lower for keyword in ['importerror', 'modulenotfounderror']):
-            return IssueCategory.IMPORT_ERROR, IssueSeverity.CRITICAL
-            
-        if any(keyword in desc_lower for keyword in ['typeerror', 'type error']):
-            return IssueCategory.TYPE_ERROR, IssueSeverity.HIGH
-            
-        # Performance and style issues
-        if any(keyword in desc_lower for keyword in ['performance', 'inefficient', 'blocking']):
-            return IssueCategory.PERFORMANCE, IssueSeverity.MEDIUM
-            
-        if any(keyword in desc_lower for keyword in ['print statement', 'debug', 'cosmetic']):
-            return IssueCategory.STYLE, IssueSeverity.LOW
-        
-        # Default classification
-        return IssueCategory.RUNTIME_ERROR, IssueSeverity.MEDIUM
+        return _classify_description(description)
     
     def _build_dependency_order(self, repo_analysis: Dict[str, Any]) -> List[str]:
         """Build optimal file repair order based on dependencies."""
@@ -326,24 +588,45 @@ class StrategicPlanningAgent:
         import_graph = repo_analysis.get('import_graph', {})
         python_files = repo_analysis.get('python_files', [])
         
+        # Map module names to files once so each import resolves with one lookup
+        stems = repo_analysis.get('stems', {})
+        basename_index: Dict[str, List[str]] = {}
+        if isinstance(python_files, list):
+            for py_file in python_files:
+                if isinstance(py_file, str):
+                    stem = stems.get(py_file)
+                    if stem is None:
+                        stem = os.path.splitext(os.path.basename(py_file))[0]
+                    basename_index.setdefault(stem, []).append(py_file)
+        
         # Simple topological sort for dependency order
         dependency_order = []
         visited = set()
         
+        def dependencies_of(file_path):
+            # Map each import's last component to matching files
+            for imported_module in import_graph.get(file_path, []):
+                yield from basename_index.get(imported_module.split('.')[-1], ())
+        
         def visit(file_path):
             if file_path in visited:
                 return
             visited.add(file_path)
             
-            # Visit dependencies first
-            for imported_module in import_graph.get(file_path, []):
-                # Try to map import to file path
-                for py_file in python_files:
-                    if imported_module in os.path.basename(py_file):
-                        visit(py_file)
+            # Iterative post-order DFS: dependencies are emitted before their
+            # importers without recursing, so deep import chains cannot hit
+            # the interpreter's recursion limit
+            stack = [(file_path, dependencies_of(file_path))]
+            while stack:
+                node, dependencies = stack[-1]
+                for dependency in dependencies:
+                    if dependency not in visited:
+                        visited.add(dependency)
+                        stack.append((dependency, dependencies_of(dependency)))
                         break
-            
-            dependency_order.append(file_path)
+                else:
+                    stack.pop()
+                    dependency_order.append(node)
         
         # Start with entry points and core modules
         entry_points = repo_analysis.get('entry_points', [])
@@ -401,25 +684,35 @@ class StrategicPlanningAgent:
         
         logger.info(f"📊 Analyzing {len(python_files)} Python files and {len(issues)} issues")
         
+        # Count critical issues per file once instead of rescanning issues for every file
+        critical_per_file = Counter(
+            issue.file_path for issue in issues if issue.severity == IssueSeverity.CRITICAL
+        )
+        
+        # Lookups hoisted out of the scoring loop; membership sets keep it
+        # linear in the number of files
+        entry_points = set(repo_analysis.get('entry_points') or ())
+        core_modules = set(repo_analysis.get('core_modules') or ())
+        complexity_scores = repo_analysis.get('complexity_scores') or {}
+        
         # Score files based on multiple factors
         for file_path in python_files:
             try:
                 score = 0
                 
                 # Higher score for entry points
-                if file_path in repo_analysis.get('entry_points', []):
+                if file_path in entry_points:
                     score += 100
                     
                 # Higher score for core modules  
-                if file_path in repo_analysis.get('core_modules', []):
+                if file_path in core_modules:
                     score += 50
                     
                 # Higher score for files with critical issues
-                critical_issues = [i for i in issues if hasattr(i, 'file_path') and hasattr(i, 'severity') and i.file_path == file_path and i.severity == IssueSeverity.CRITICAL]
-                score += len(critical_issues) * 20
+                score += critical_per_file.get(file_path, 0) * 20
                 
                 # Higher score for files with many dependencies
-                complexity = repo_analysis.get('complexity_scores', {}).get(file_path, 0)
+                complexity = complexity_scores.get(file_path, 0)
                 if isinstance(complexity, (int, float)):
                     score += complexity
                 
@@ -429,10 +722,10 @@ class StrategicPlanningAgent:
                 logger.error(f"❌ Error scoring file {file_path}: {e}")
                 continue
         
-        # Sort by score and return top files
+        # Select the top scoring files
         try:
-            sorted_files = sorted(file_scores.items(), key=lambda x: x[1], reverse=True)
-            result = [file_path for file_path, score in sorted_files[:10]]  # Top 10 critical files
+            top_files = heapq.nlargest(10, file_scores.items(), key=itemgetter(1))  # Top 10 critical files
+            result = [file_path for file_path, score in top_files]
             logger.info(f"📋 Identified {len(result)} critical files")
             return result
         except Exception as e:
@@ -458,7 +751,7 @@ class StrategicPlanningAgent:
         # Filter out any invalid issue objects
         valid_issues = []
         for i, issue in enumerate(issues):
-            if hasattr(issue, 'issue_type') and hasattr(issue, 'file_path'):
+            if isinstance(issue, Issue):
                 valid_issues.append(issue)
             else:
                 logger.warning(f"⚠️ Invalid issue at index {i}: {type(issue)} - {issue}")
@@ -479,12 +772,23 @@ class StrategicPlanningAgent:
             ))
             return tasks
         
+        # Bucket issues and their files by category in a single pass; import
+        # and runtime errors are fixed by the same task, so they share a bucket
+        buckets = {category: [] for category in IssueCategory}
+        file_sets = {category: set() for category in IssueCategory}
+        for issue in valid_issues:
+            category = issue.issue_type
+            if category == IssueCategory.IMPORT_ERROR:
+                category = IssueCategory.RUNTIME_ERROR
+            buckets[category].append(issue)
+            file_sets[category].add(issue.file_path)
+        
         # Task 1: Critical Syntax Errors (highest priority)
-        syntax_issues = [i for i in valid_issues if i.issue_type == IssueCategory.SYNTAX_ERROR]
+        syntax_issues = buckets[IssueCategory.SYNTAX_ERROR]
         if syntax_issues:
             tasks.append(RepairTask(
                 task_id="task_1_syntax_errors",
-                target_files=list(set(i.file_path for i in syntax_issues)),
+                target_files=list(file_sets[IssueCategory.SYNTAX_ERROR]),
                 issues_to_fix=syntax_issues,
                 strategy="Fix syntax errors using pattern-based corrections and AI assistance",
                 priority=1,
@@ -493,11 +797,11 @@ class StrategicPlanningAgent:
             ))
         
         # Task 2: Import and Runtime Errors
-        import_runtime_issues = [i for i in valid_issues if i.issue_type in [IssueCategory.IMPORT_ERROR, IssueCategory.RUNTIME_ERROR]]
+        import_runtime_issues = buckets[IssueCategory.RUNTIME_ERROR]
         if import_runtime_issues:
             tasks.append(RepairTask(
                 task_id="task_2_runtime_errors",
-                target_files=list(set(i.file_path for i in import_runtime_issues)),
+                target_files=list(file_sets[IssueCategory.RUNTIME_ERROR]),
                 issues_to_fix=import_runtime_issues,
                 strategy="Resolve missing imports and undefined references using repository context",
                 priority=2,
@@ -507,11 +811,11 @@ class StrategicPlanningAgent:
             ))
         
         # Task 3: Type Errors and Logic Issues
-        type_issues = [i for i in valid_issues if i.issue_type == IssueCategory.TYPE_ERROR]
+        type_issues = buckets[IssueCategory.TYPE_ERROR]
         if type_issues:
             tasks.append(RepairTask(
                 task_id="task_3_type_errors",
-                target_files=list(set(i.file_path for i in type_issues)),
+                target_files=list(file_sets[IssueCategory.TYPE_ERROR]),
                 issues_to_fix=type_issues,
                 strategy="Fix type mismatches and logical errors using AI analysis",
                 priority=3,
@@ -521,11 +825,11 @@ class StrategicPlanningAgent:
             ))
         
         # Task 4: Performance Optimization
-        perf_issues = [i for i in valid_issues if i.issue_type == IssueCategory.PERFORMANCE]
+        perf_issues = buckets[IssueCategory.PERFORMANCE]
         if perf_issues:
             tasks.append(RepairTask(
                 task_id="task_4_performance",
-                target_files=list(set(i.file_path for i in perf_issues)),
+                target_files=list(file_sets[IssueCategory.PERFORMANCE]),
                 issues_to_fix=perf_issues,
                 strategy="Optimize performance bottlenecks and inefficient patterns",
                 priority=4,
@@ -535,11 +839,11 @@ class StrategicPlanningAgent:
             ))
         
         # Task 5: Style and Cleanup
-        style_issues = [i for i in valid_issues if i.issue_type == IssueCategory.STYLE]
+        style_issues = buckets[IssueCategory.STYLE]
         if style_issues:
             tasks.append(RepairTask(
                 task_id="task_5_cleanup",
-                target_files=list(set(i.file_path for i in style_issues)),
+                target_files=list(file_sets[IssueCategory.STYLE]),
                 issues_to_fix=style_issues,
                 strategy="Clean up code style and remove debug statements",
                 priority=5,
@@ -555,19 +859,14 @@ class StrategicPlanningAgent:
         if not tasks:
             return 1.0
         
-        # Base probability factors
-        complexity_factors = {
-            "Low": 0.9,
-            "Medium": 0.75,
-            "High": 0.6
-        }
-        
-        total_probability = 1.0
-        for task in tasks:
-            task_prob = complexity_factors.get(task.estimated_complexity, 0.7)
-            total_probability *= task_prob
+        # Sum log-probabilities rather than multiplying, so long task lists
+        # cannot underflow to zero
+        log_probability = math.fsum(
+            _LOG_COMPLEXITY_PROBABILITY.get(task.estimated_complexity, _LOG_DEFAULT_PROBABILITY)
+            for task in tasks
+        )
         
-        return round(total_probability, 2)
+        return round(math.exp(log_probability), 2)
     
     def _estimate_duration(self, tasks: List[RepairTask]) -> str:
         """Estimate total repair duration based on tasks."""
@@ -601,10 +900,11 @@ class StrategicPlanningAgent:
             # Find nodes with high connectivity (assuming this method exists)
             if hasattr(self.analyzer.kg, 'find_critical_components'):
                 critical_components = self.analyzer.kg.find_critical_components()[:5]
-                for component in critical_components:
-                    name = component.get('name', '')
-                    if name.startswith('file:'):
-                        core_modules.append(name.replace('file:', ''))
+                core_modules = [
+                    name.replace('file:', '')
+                    for name in (component.get('name', '') for component in critical_components)
+                    if name.startswith('file:')
+                ]
         except Exception as e:
             logger.warning(f"Failed to identify core modules from KG: {e}")
         
@@ -612,15 +912,16 @@ class StrategicPlanningAgent:
     
     def _ai_enhance_classification(self, issues: List[Issue], description: str) -> List[Issue]:
         """Use AI to enhance issue classification and add suggested fixes."""
-        if not self.genai_client:
+        if not self.genai_client or not issues:
             return issues
         
         try:
-            # Create AI prompt for issue analysis
-            issues_summary = "\n".join([
-                f"- {issue.file_path}:{issue.line_number} - {issue.description}" 
+            # Create AI prompt for issue analysis; descriptions are truncated
+            # to bound the prompt size
+            issues_summary = "\n".join(
+                f"- {issue.file_path}:{issue.line_number} - {issue.description[:_PROMPT_DESCRIPTION_LIMIT]}"
                 for issue in issues[:10]  # Limit to first 10 for prompt size
-            ])
+            )
             
             prompt = f"""Analyze these code issues and provide strategic insights:
 
@@ -648,35 +949,43 @@ Respond in JSON format with enhanced classification."""
         
         return issues
     
-    def _log_plan_summary(self, plan: RepairPlan):
-        """Log a comprehensive summary of the repair plan."""
-        logger.info("=" * 60)
-        logger.info("🧠 STRATEGIC REPAIR PLAN CREATED")
-        logger.info("=" * 60)
-        logger.info(f"📁 Repository: {os.path.basename(plan.repository_path)}")
-        logger.info(f"🔍 Total Issues: {plan.total_issues}")
-        logger.info(f"📋 Repair Tasks: {len(plan.tasks)}")
-        logger.info(f"⏰ Estimated Duration: {plan.estimated_duration}")
-        logger.info(f"📊 Success Probability: {plan.success_probability:.1%}")
-        logger.info("")
-        
-        logger.info("🎯 CRITICAL PATH (Priority Files):")
-        for i, file_path in enumerate(plan.critical_path[:5], 1):
-            logger.info(f"   {i}. {os.path.basename(file_path)}")
-        
-        logger.info("")
-        logger.info("📋 REPAIR TASKS:")
+    def _log_plan_summary(self, plan: RepairPlan, basenames: Optional[Dict[str, str]] = None):
+        """Log a comprehensive summary of the repair plan as a single record."""
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        
+        basenames = basenames or {}
+        lines = [
+            "=" * 60,
+            "🧠 STRATEGIC REPAIR PLAN CREATED",
+            "=" * 60,
+            f"📁 Repository: {os.path.basename(plan.repository_path)}",
+            f"🔍 Total Issues: {plan.total_issues}",
+            f"📋 Repair Tasks: {len(plan.tasks)}",
+            f"⏰ Estimated Duration: {plan.estimated_duration}",
+            f"📊 Success Probability: {plan.success_probability:.1%}",
+            "",
+            "🎯 CRITICAL PATH (Priority Files):",
+        ]
+        lines.extend([
+            f"   {i}. {basenames.get(file_path) or os.path.basename(file_path)}"
+            for i, file_path in enumerate(plan.critical_path[:5], 1)
+        ])
+        lines.append("")
+        lines.append("📋 REPAIR TASKS:")
+        append = lines.append
         for task in plan.tasks:
-            logger.info(f"   {task.priority}. {task.task_id}")
-            logger.info(f"      Strategy: {task.strategy}")
-            logger.info(f"      Files: {len(task.target_files)} files")
-            logger.info(f"      Issues: {len(task.issues_to_fix)} issues")
-            logger.info(f"      Complexity: {task.estimated_complexity}")
+            append(f"   {task.priority}. {task.task_id}")
+            append(f"      Strategy: {task.strategy}")
+            append(f"      Files: {len(task.target_files)} files")
+            append(f"      Issues: {len(task.issues_to_fix)} issues")
+            append(f"      Complexity: {task.estimated_complexity}")
             if task.prerequisites:
-                logger.info(f"      Prerequisites: {', '.join(task.prerequisites)}")
-            logger.info("")
+                append(f"      Prerequisites: {', '.join(task.prerequisites)}")
+            append("")
         
-        logger.info("=" * 60)
+        append("=" * 60)
+        logger.info("\n".join(lines))
     
     def get_next_task(self) -> Optional[RepairTask]:
         """Get the next repair task to execute based on the plan."""
@@ -685,7 +994,7 @@ Respond in JSON format with enhanced classification."""
         
         # Find first incomplete task with satisfied prerequisites
         for task in self.current_plan.tasks:
-            if not hasattr(task, 'completed') or not task.completed:
+            if not task.completed:
                 # Check if prerequisites are satisfied
                 if all(self._is_task_completed(prereq) for prereq in task.prerequisites):
                     return task
@@ -697,59 +1006,111 @@ Respond in JSON format with enhanced classification."""
         if not self.current_plan:
             return False
         
-        for task in self.current_plan.tasks:
-            if task.task_id == task_id:
-                return getattr(task, 'completed', False)
-        
-        return True  # If task not found, assume it's completed
+        # Prerequisites that are not part of the plan (their category had no
+        # issues) count as completed
+        return task_id in self._completed or task_id not in self._tasks_by_id
     
     def mark_task_completed(self, task_id: str):
         """Mark a task as completed."""
         if not self.current_plan:
             return
         
-        for task in self.current_plan.tasks:
-            if task.task_id == task_id:
-                task.completed = True
-                logger.info(f"✅ Task completed: {task_id}")
-                break
+        task = self._tasks_by_id.get(task_id)
+        if task is not None:
+            task.completed = True
+            self._completed.add(task_id)
+            logger.info(f"✅ Task completed: {task_id}")
+    
+    @staticmethod
+    def _write_plan_file(data: bytes, output_path: str, fsync: bool = False) -> bool:
+        """Write serialized plan bytes to output_path; returns False on I/O errors."""
+        # Write a sibling temp file and swap it in, so a failed export never
+        # leaves a truncated plan behind
+        tmp_path = output_path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                if output_path.endswith('.gz'):
+                    # Level 1 keeps compression nearly free; plan JSON still shrinks
+                    # several-fold thanks to its repeated keys and strategies
+                    with gzip.GzipFile(os.path.basename(output_path), 'wb', 1, f) as gz:
+                        gz.write(data)
+                else:
+                    f.write(data)
+                if fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, output_path)
+        except OSError as e:
+            logger.error("Failed to export plan: %s", e)
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+        
+        logger.info("📄 Plan exported to: %s", output_path)
+        return True
+    
+    @classmethod
+    def export_many(
+        cls,
+        plans: List[RepairPlan],
+        output_paths: List[str],
+        pretty: bool = False,
+        fsync: bool = False,
+        columnar: bool = False
+    ) -> List[bool]:
+        """
+        Export several plans at once on a thread pool.
+        
+        Each plan is encoded and written exactly as export_plan would. File I/O
+        releases the GIL, so the writes overlap. Returns one success flag per
+        path, in order.
+        """
+        if len(plans) != len(output_paths):
+            raise ValueError("plans and output_paths must have the same length")
+        if not plans:
+            return []
+        
+        def export_one(plan: RepairPlan, output_path: str) -> bool:
+            data = plan.to_json_bytes(pretty, columnar)
+            return cls._write_plan_file(data, output_path, fsync)
+        
+        max_workers = min(len(plans), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(export_one, plans, output_paths))
     
-    def export_plan(self, output_path: str):
-        """Export the repair plan to a JSON file."""
+    def export_plan(
+        self,
+        output_path: str,
+        pretty: bool = False,
+        fsync: bool = False,
+        columnar: bool = False
+    ):
+        """
+        Export the repair plan to a JSON file.
+        
+        Values are written compactly by default, which keeps encoding on the C
+        fast path; pretty=True reproduces the indented json.dump(indent=2) layout.
+        Encoding goes through orjson when it is installed, and RawJSON values
+        anywhere in the plan are written verbatim. The serialized bytes are
+        reused for repeated exports of the same plan object with the same options.
+        Paths ending in .gz are written gzip-compressed.
+        
+        The file is replaced atomically; fsync=True also flushes it to disk
+        before the swap, at the cost of a disk round-trip. columnar=True writes
+        tasks as parallel per-field lists, which avoids one dict per task and
+        the repeated keys in the output.
+        """
         if not self.current_plan:
             logger.warning("No plan to export")
             return
         
-        try:
-            plan_dict = {
-                'plan_id': self.current_plan.plan_id,
-                'repository_path': self.current_plan.repository_path,
-                'total_issues': self.current_plan.total_issues,
-                'estimated_duration': self.current_plan.estimated_duration,
-                'success_probability': self.current_plan.success_probability,
-                'created_at': self.current_plan.created_at.isoformat(),
-                'critical_path': self.current_plan.critical_path,
-                'dependency_order': self.current_plan.dependency_order,
-                'tasks': []
-            }
-            
-            for task in self.current_plan.tasks:
-                task_dict = {
-                    'task_id': task.task_id,
-                    'target_files': task.target_files,
-                    'strategy': task.strategy,
-                    'priority': task.priority,
-                    'estimated_complexity': task.estimated_complexity,
-                    'prerequisites': task.prerequisites,
-                    'expected_outcome': task.expected_outcome,
-                    'issues_count': len(task.issues_to_fix)
-                }
-                plan_dict['tasks'].append(task_dict)
-            
-            with open(output_path, 'w') as f:
-                json.dump(plan_dict, f, indent=2)
-            
-            logger.info(f"📄 Plan exported to: {output_path}")
-            
-        except Exception as e:
-            logger.error(f"Failed to export plan: {e}")
\ No newline at end of file
+        plan = self.current_plan
+        options = (pretty, columnar)
+        if self._export_plan is not plan or self._export_options != options:
+            self._export_cache = plan.to_json_bytes(pretty, columnar)
+            self._export_plan = plan
+            self._export_options = options
+        
+        self._write_plan_file(self._export_cache, output_path, fsync)
\ No newline at end of file
@@ -13,18 +13,25 @@ Usage:
 """
 
 import os
+import re
+import ast
 import sys
 import json
 import time
+import hashlib
+import asyncio
+import threading
 import argparse
 import logging
-from typing import Dict, List, Optional, Any, Tuple, Set
-from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Any, Tuple, Set
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timedelta
 from pathlib import Path
 import subprocess
 import tempfile
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 
 # Google GenAI imports
 try:
@@ -43,11 +50,176 @@ from agents.enhanced_analyzer import EnhancedDependencyAnalyzer
 from core.knowledge_graph import KnowledgeGraph
 from agents.fast_analyzer import FastRepositoryAnalyzer
 from agents.planning_agent import StrategicPlanningAgent, RepairPlan, RepairTask
+from agents.file_runner import run_python_file
+from agents.file_walk import iter_python_files
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Shared tail of the repository context given with every fix prompt
+_FIX_PATTERNS_CONTEXT = """
+COMMON FIX PATTERNS:
+  - For missing classes: Define class or import from another file
+  - For encoding errors: Replace Unicode with ASCII equivalents
+  - For NameError: Check if function/variable is defined or imported
+  - For Windows: Use 'utf-8' encoding and ASCII symbols"""
+
+# Fixing priorities and rules shared by the single-file and batched fix prompts
+_FIX_GUIDELINES = """CRITICAL FIXING PRIORITIES (fix in this order):
+1. RUNTIME ERRORS: NameError, AttributeError, ImportError, TypeError
+2. SYNTAX ERRORS: Missing colons, parentheses, indentation
+3. WINDOWS COMPATIBILITY: Unicode/encoding issues (use ASCII-safe characters)
+4. MISSING DEPENDENCIES: Undefined classes, functions, imports
+5. LOGIC ERRORS: Type mismatches, incorrect algorithms
+
+IMPORTANT RULES:
+- For Windows console: Replace Unicode symbols (✅❌🔍) with ASCII (OK/FAIL/INFO)
+- Fix undefined classes/functions by either importing or defining them
+- Only fix critical issues that break execution
+- Ignore cosmetic issues like print statements unless they cause encoding errors
+- Preserve original functionality and structure
+- Use proper error handling and type checking"""
+
+# Fields of the JSON answer to a fix prompt, described for the model; the fix
+# itself is either a unified diff or, as a fallback, the complete file
+_FIX_RESPONSE_FIELDS = """- issue_found: the specific critical issue you found, or "No critical issues found"
+- confidence: your confidence level from 0.0 to 1.0"""
+_FIXED_CODE_FIELD = """- fixed_code: the complete corrected file content, or "NO_FIX_NEEDED" if no changes required"""
+_FIXED_PATCH_FIELD = """- fixed_patch: a unified diff of your changes against the current file content (@@ hunks with 3 lines of unchanged context), or "NO_FIX_NEEDED" if no changes required"""
+
+# Hunk header of a unified diff; only the old start line is used, as a hint
+_HUNK_HEADER_RE = re.compile(r'^@@ -(\d+)(?:,\d+)? \+\d+(?:,\d+)? @@')
+
+# Batched fix prompts pack small files up to this many (estimated) tokens
+_BATCH_TOKEN_BUDGET = 30000
+_CHARS_PER_TOKEN = 4
+
+# Default (estimated) token budget for the repository symbols block in fix prompts
+_CONTEXT_BUDGET_TOKENS = 4000
+
+# Knowledge graph hops from issue-matching files that still raise a file's relevance
+_CONTEXT_GRAPH_DEPTH = 3
+
+# Default size cap for files sent to the LLM; larger files are not fixed
+_MAX_FIX_FILE_BYTES = 256 * 1024
+
+# Most fix results kept for files sent again with unchanged content and issue
+_FIX_CACHE_SIZE = 256
+
+# Structured output for fix prompts: the model returns JSON constrained to
+# these schemas, so responses are read with json.loads instead of text parsing.
+# Properties are generated in order, so confidence streams in before the code.
+_FIX_SCHEMA = {
+    'type': 'OBJECT',
+    'properties': {
+        'issue_found': {'type': 'STRING'},
+        'confidence': {'type': 'NUMBER'},
+        'fixed_code': {'type': 'STRING'},
+    },
+    'required': ['issue_found', 'confidence', 'fixed_code'],
+    'property_ordering': ['issue_found', 'confidence', 'fixed_code'],
+}
+
+# Single-file fix prompts ask for a patch rather than the whole file
+_PATCH_FIX_SCHEMA = {
+    'type': 'OBJECT',
+    'properties': {
+        'issue_found': {'type': 'STRING'},
+        'confidence': {'type': 'NUMBER'},
+        'fixed_patch': {'type': 'STRING'},
+    },
+    'required': ['issue_found', 'confidence', 'fixed_patch'],
+    'property_ordering': ['issue_found', 'confidence', 'fixed_patch'],
+}
+
+# Batched fix prompts get one entry per file, keyed by its path
+_BATCH_FIX_SCHEMA = {
+    'type': 'ARRAY',
+    'items': {
+        'type': 'OBJECT',
+        'properties': {'path': {'type': 'STRING'}, **_FIX_SCHEMA['properties']},
+        'required': ['path', *_FIX_SCHEMA['required']],
+        'property_ordering': ['path', *_FIX_SCHEMA['property_ordering']],
+    },
+}
+
+# Fixes at or below this confidence are not applied
+_MIN_FIX_CONFIDENCE = 0.3
+
+# Confidence of a single-file JSON fix response, readable from a partial stream
+_STREAMED_CONFIDENCE_RE = re.compile(r'"confidence"\s*:\s*(-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)\s*[,}]')
+
+def _apply_unified_diff(original: str, diff: str) -> Optional[str]:
+    """
+    Apply a unified diff to original text, returning the patched text.
+    
+    Hunks are matched on their context and removed lines rather than trusted
+    line numbers: each is placed at the matching position nearest its header,
+    after the previous hunk. Returns None if the diff has no hunks or any hunk
+    does not match.
+    """
+    hunks = []  # (old start line, old lines, new lines)
+    in_hunk = False
+    diff_lines = diff.split('\n')
+    for line, next_line in zip(diff_lines, diff_lines[1:] + ['']):
+        header = _HUNK_HEADER_RE.match(line)
+        if header:
+            hunks.append((int(header.group(1)), [], []))
+            in_hunk = True
+        elif line.startswith('--- ') and next_line.startswith('+++ '):
+            in_hunk = False  # file headers of the next diff
+        elif not in_hunk or line.startswith('\\'):
+            continue  # file headers, "\ No newline at end of file" markers
+        elif line.startswith('-'):
+            hunks[-1][1].append(line[1:])
+        elif line.startswith('+'):
+            hunks[-1][2].append(line[1:])
+        else:
+            # Context line; blank ones often lose their leading space
+            hunks[-1][1].append(line[1:])
+            hunks[-1][2].append(line[1:])
+    
+    if not hunks:
+        return None
+    
+    source = original.split('\n')
+    result = []
+    position = 0
+    for start, old, new in hunks:
+        size = len(old)
+        if not size:
+            # Pure insertion: the header names the line it goes after
+            at = min(max(start, position), len(source))
+        else:
+            hint = start - 1
+            # list.index finds candidate first lines in C; only those are compared in full
+            matches = []
+            first_line = old[0]
+            last_start = len(source) - size + 1
+            index = position
+            while True:
+                try:
+                    index = source.index(first_line, index, last_start)
+                except ValueError:
+                    break
+                if source[index:index + size] == old:
+                    matches.append(index)
+                index += 1
+            if not matches:
+                return None
+            at = min(matches, key=lambda index: abs(index - hint))
+        result.extend(source[position:at])
+        result.extend(new)
+        position = at + size
+    result.extend(source[position:])
+    return '\n'.join(result)
+
+def _is_low_confidence(response: str) -> bool:
+    """Whether a (possibly partial) single-file fix response already shows a confidence too low to apply."""
+    match = _STREAMED_CONFIDENCE_RE.search(response)
+    return match is not None and float(match.group(1)) <= _MIN_FIX_CONFIDENCE
+
 @dataclass
 class HealingSession:
     """Tracks a complete healing session."""
@@ -57,6 +229,11 @@ class HealingSession:
     timeout_seconds: int
     start_time: datetime = field(default_factory=datetime.now)
     
+    # Monotonic clock readings, immune to wall-clock changes, for timing;
+    # start_time is kept for display
+    start_monotonic: float = field(default_factory=time.monotonic, repr=False)
+    deadline: float = field(init=False, repr=False)
+    
     # Progress tracking
     current_iteration: int = 0
     files_modified: Set[str] = field(default_factory=set)
@@ -67,6 +244,9 @@ class HealingSession:
     status: str = "in_progress"  # in_progress, solved, timeout, failed
     final_message: str = ""
     total_time: float = 0.0
+    
+    def __post_init__(self):
+        self.deadline = self.start_monotonic + self.timeout_seconds
 
 @dataclass
 class FileFix:
@@ -79,15 +259,69 @@ class FileFix:
     confidence: float
     iteration: int
 
+@dataclass
+class FileSymbols:
+    """An indexed file's imports and symbols, normalized once per analysis for fix prompts."""
+    imports: List[Any] = field(default_factory=list)
+    classes: List[str] = field(default_factory=list)
+    functions: List[str] = field(default_factory=list)
+    symbol_count: int = 0
+    
+    @classmethod
+    def from_file_info(cls, file_info: Dict[str, Any]) -> 'FileSymbols':
+        """Normalize a dependency-data file entry, whose symbols are a list of dicts or just a count."""
+        file_symbols = cls()
+        imports = file_info.get('imports', [])
+        if isinstance(imports, list):
+            file_symbols.imports = imports
+        
+        symbols = file_info.get('symbols', [])
+        if isinstance(symbols, list):
+            file_symbols.symbol_count = len(symbols)
+            for s in symbols:
+                if isinstance(s, dict):
+                    symbol_type = s.get('type', '')
+                    symbol_name = s.get('name', '')
+                    if symbol_name:
+                        if symbol_type == 'class':
+                            file_symbols.classes.append(symbol_name)
+                        elif symbol_type == 'function':
+                            file_symbols.functions.append(symbol_name)
+        elif isinstance(symbols, int):
+            file_symbols.symbol_count = symbols
+        return file_symbols
+
 class GenAIClient:
     """Google GenAI client for LLM interactions using the google-genai library."""
     
-    def __init__(self, service_account_path: str):
+    # Clients by service account, shared by every agent in the process so
+    # their HTTP connections are reused
+    _shared: Dict[str, 'GenAIClient'] = {}
+    
+    def __init__(self, service_account_path: str, max_concurrency: int = 16, requests_per_minute: int = 500):
         self.service_account_path = service_account_path
         self.client = None
         self.model_name = "gemini-2.5-flash"
+        
+        # Batch limits: concurrent requests in flight and a request rate cap
+        self.max_concurrency = max_concurrency
+        self._request_interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._next_request_slot = 0.0
+        
+        # Event loop running every batch, started on first use (see _event_loop)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+        
         self._initialize()
     
+    @classmethod
+    def shared(cls, service_account_path: str) -> 'GenAIClient':
+        """Return the process-wide client for a service account, creating it on first use."""
+        client = cls._shared.get(service_account_path)
+        if client is None:
+            client = cls._shared[service_account_path] = cls(service_account_path)
+        return client
+    
     def _initialize(self):
         """Initialize GenAI client."""
         if not GENAI_AVAILABLE:
@@ -110,12 +344,55 @@ class GenAIClient:
             logger.error(f"❌ Failed to initialize GenAI: {e}")
             raise
     
-    def generate_text(self, prompt: str, max_tokens: int = 2048) -> str:
-        """Generate text using GenAI."""
+    @staticmethod
+    def _generation_config(response_schema: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Request config asking for JSON constrained to response_schema, if one is given."""
+        if response_schema is None:
+            return None
+        return {'response_mime_type': 'application/json', 'response_schema': response_schema}
+    
+    def generate_text(
+        self,
+        prompt: str,
+        max_tokens: int = 2048,
+        response_schema: Optional[Dict[str, Any]] = None,
+        stop_when: Optional[Callable[[str], bool]] = None
+    ) -> str:
+        """
+        Generate text using GenAI; response_schema requests JSON output.
+        
+        The response is streamed. Once stop_when returns True for the text
+        received so far, the rest is not generated and that partial text is
+        returned.
+        """
+        try:
+            text = ''
+            for chunk in self.client.models.generate_content_stream(
+                model=self.model_name,
+                contents=[prompt],
+                config=self._generation_config(response_schema)
+            ):
+                if chunk.text:
+                    text += chunk.text
+                    if stop_when is not None and stop_when(text):
+                        break
+            
+            if text:
+                return text.strip()
+            else:
+                raise Exception("Empty response from GenAI")
+                
+        except Exception as e:
+            logger.error(f"❌ GenAI generation failed: {e}")
+            return f"Error generating response: {e}"
+    
+    async def generate_text_async(self, prompt: str, max_tokens: int = 2048, response_schema: Optional[Dict[str, Any]] = None) -> str:
+        """Generate text using the GenAI async client; response_schema requests JSON output."""
         try:
-            response = self.client.models.generate_content(
+            response = await self.client.aio.models.generate_content(
                 model=self.model_name,
-                contents=[prompt]
+                contents=[prompt],
+                config=self._generation_config(response_schema)
             )
             
             if response and response.text:
@@ -126,13 +403,85 @@ class GenAIClient:
         except Exception as e:
             logger.error(f"❌ GenAI generation failed: {e}")
             return f"Error generating response: {e}"
+    
+    def generate_batch(
+        self,
+        prompts: List[str],
+        max_tokens: int = 2048,
+        response_schemas: Optional[List[Optional[Dict[str, Any]]]] = None
+    ) -> List[str]:
+        """
+        Generate text for several prompts concurrently.
+        
+        Requests overlap up to max_concurrency at a time and are spaced to stay
+        under requests_per_minute. response_schemas optionally gives one JSON
+        schema (or None) per prompt. Responses are returned in prompt order.
+        """
+        if not prompts:
+            return []
+        if response_schemas is None:
+            response_schemas = [None] * len(prompts)
+        batch = self._generate_batch_async(prompts, max_tokens, response_schemas)
+        return asyncio.run_coroutine_threadsafe(batch, self._event_loop()).result()
+    
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        """
+        Return the event loop batches run on, starting it on a daemon thread on first use.
+        
+        The async client keeps pooled connections bound to the loop that
+        opened them, so every batch for the lifetime of this client runs on
+        the same loop rather than a new one per call.
+        """
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name='genai-batch-loop', daemon=True).start()
+            return self._loop
+    
+    async def _generate_batch_async(
+        self,
+        prompts: List[str],
+        max_tokens: int,
+        response_schemas: List[Optional[Dict[str, Any]]]
+    ) -> List[str]:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        slot_lock = asyncio.Lock()
+        
+        async def generate_one(prompt: str, response_schema: Optional[Dict[str, Any]]) -> str:
+            async with semaphore:
+                await self._wait_for_request_slot(slot_lock)
+                return await self.generate_text_async(prompt, max_tokens, response_schema)
+        
+        return await asyncio.gather(*map(generate_one, prompts, response_schemas))
+    
+    async def _wait_for_request_slot(self, slot_lock: asyncio.Lock):
+        """Reserve the next request slot under the rate cap and sleep until it opens."""
+        if not self._request_interval:
+            return
+        async with slot_lock:
+            now = time.monotonic()
+            slot = max(now, self._next_request_slot)
+            self._next_request_slot = slot + self._request_interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
 
 class SelfHealingAgent:
     """Self-healing repository agent with multi-layer intelligence."""
     
-    def __init__(self, service_account_path: str):
+    def __init__(
+        self,
+        service_account_path: str,
+        context_budget_tokens: int = _CONTEXT_BUDGET_TOKENS,
+        max_file_bytes: int = _MAX_FIX_FILE_BYTES
+    ):
         self.service_account_path = service_account_path
         
+        # Estimated token cap for the symbols block in fix prompts (0 for no limit)
+        self.context_budget_tokens = context_budget_tokens
+        
+        # Size cap for files sent to the LLM (0 for no limit)
+        self.max_file_bytes = max_file_bytes
+        
         # Initialize intelligence layers
         self.analyzer = EnhancedDependencyAnalyzer()
         self.genai_client = None
@@ -140,9 +489,27 @@ class SelfHealingAgent:
         # Session tracking
         self.current_session: Optional[HealingSession] = None
         
+        # Normalized per-file symbols and the repository-wide symbols block
+        # shared by every fix prompt; rebuilt by analyze_repository
+        self._file_symbols: Dict[str, FileSymbols] = {}
+        self._symbols_context_str: Optional[str] = None
+        
+        # Index from the last full analysis, reused to re-index modified files
+        self._fast_analyzer: Optional[FastRepositoryAnalyzer] = None
+        
+        # Paths relative to the session's repository, memoized for logs and prompts
+        self._rel_paths: Dict[str, str] = {}
+        
+        # File contents by path with the (st_mtime_ns, st_size) they were read at
+        self._content_cache: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        
+        # Fix results (None when no fix should be applied) by
+        # (file_path, content hash, issue hash), least recently used first
+        self._fix_cache: 'OrderedDict[Tuple[str, str, str], Optional[FileFix]]' = OrderedDict()
+        
         # Initialize LLM client
         try:
-            self.genai_client = GenAIClient(service_account_path)
+            self.genai_client = GenAIClient.shared(service_account_path)
         except Exception as e:
             logger.warning(f"⚠️  GenAI not available: {e}")
     
@@ -156,6 +523,8 @@ class SelfHealingAgent:
         )
         
         self.current_session = session
+        self._rel_paths.clear()
+        self._content_cache.clear()
         
         logger.info(f"🚀 Starting Self-Healing Session")
         logger.info(f"📁 Repository: {session.repo_path}")
@@ -178,11 +547,17 @@ class SelfHealingAgent:
         if not analyzer.analyze_repository():
             logger.error("❌ Failed to analyze repository")
             return False
+        self._fast_analyzer = analyzer
         
         # Step 2: Load enhanced data with knowledge graph
         if not self.analyzer.load_and_enhance_data():
             logger.error("❌ Failed to load enhanced dependency data")
             return False
+        self._file_symbols = {
+            file_path: FileSymbols.from_file_info(file_info)
+            for file_path, file_info in self.analyzer.dependency_data.get('files', {}).items()
+        }
+        self._symbols_context_str = self._build_symbols_context()
         
         files_count = len(self.analyzer.dependency_data.get('files', {}))
         graph_nodes = len(self.analyzer.kg.nodes) if self.analyzer.kg else 0
@@ -206,21 +581,27 @@ class SelfHealingAgent:
         logger.info("🔍 Identifying Source Files...")
         
         candidate_files = []
+        seen: Set[str] = set()
+        
+        # Resolve indexed paths to absolute paths once for both file layers
+        repo_path = self.current_session.repo_path
+        abs_files = [
+            file_path if os.path.isabs(file_path) else os.path.join(repo_path, file_path)
+            for file_path in self.analyzer.dependency_data.get('files', {})
+        ]
+        file_names = list(map(os.path.basename, abs_files))
         
         # Layer 1: Keyword-based identification  
-        issue_keywords = issue.lower().split()
+        issue_keywords = dict.fromkeys(issue.lower().split())
         
-        for file_path in self.analyzer.dependency_data.get('files', {}):
-            # Ensure absolute path
-            if not os.path.isabs(file_path):
-                file_path = os.path.join(self.current_session.repo_path, file_path)
-            
-            file_name = os.path.basename(file_path).lower()
-            
-            # Check for keyword matches in filename
-            for keyword in issue_keywords:
-                if keyword in file_name:
-                    candidate_files.append((file_path, 0.8, f"filename contains '{keyword}'"))
+        if issue_keywords:
+            # One alternation scans each filename for every keyword in a single pass
+            keyword_pattern = re.compile('|'.join(map(re.escape, issue_keywords)))
+            for file_path, file_name in zip(abs_files, file_names):
+                match = keyword_pattern.search(file_name.lower())
+                if match:
+                    seen.add(file_path)
+                    candidate_files.append((file_path, 0.8, f"filename contains '{match.group(0)}'"))
         
         # Layer 2: Knowledge graph analysis
         if self.analyzer.kg:
@@ -228,29 +609,22 @@ class SelfHealingAgent:
             critical_files = self.analyzer.find_critical_components()[:5]
             for file_info in critical_files:
                 file_path = file_info.get('name', '').replace('file:', '')
-                if file_path and file_path not in [f[0] for f in candidate_files]:
+                if file_path and file_path not in seen:
+                    seen.add(file_path)
                     candidate_files.append((file_path, 0.6, "critical component"))
         
         # Layer 3: Main entry points (high impact)
-        main_files = ['main.py', 'app.py', 'server.py', 'index.js', 'index.ts']
-        for file_path in self.analyzer.dependency_data.get('files', {}):
-            # Ensure absolute path
-            if not os.path.isabs(file_path):
-                file_path = os.path.join(self.current_session.repo_path, file_path)
-            
-            file_name = os.path.basename(file_path)
-            if file_name in main_files:
-                if file_path not in [f[0] for f in candidate_files]:
-                    candidate_files.append((file_path, 0.9, "main entry point"))
+        main_files = {'main.py', 'app.py', 'server.py', 'index.js', 'index.ts'}
+        for file_path, file_name in zip(abs_files, file_names):
+            if file_name in main_files and file_path not in seen:
+                seen.add(file_path)
+                candidate_files.append((file_path, 0.9, "main entry point"))
         
         # Fallback: If no files found, include all Python files for LLM analysis
         if not candidate_files:
             logger.info("🔍 No candidates found, including all Python files for LLM analysis...")
-            for root, dirs, files in os.walk(self.current_session.repo_path):
-                for file in files:
-                    if file.endswith('.py') and not file.startswith('.') and not file.endswith('.backup'):
-                        file_path = os.path.join(root, file)
-                        candidate_files.append((file_path, 0.7, "Python file for analysis"))
+            for entry in iter_python_files(self.current_session.repo_path):
+                candidate_files.append((entry.path, 0.7, "Python file for analysis"))
         
         # Sort by confidence and return top candidates
         candidate_files.sort(key=lambda x: x[1], reverse=True)
@@ -258,12 +632,19 @@ class SelfHealingAgent:
         top_files = [f[0] for f in candidate_files[:5]]  # Top 5 candidates
         
         logger.info(f"📋 Identified {len(top_files)} potential source files:")
-        for i, (file_path, confidence, reason) in enumerate(candidate_files[:5], 1):
-            rel_path = os.path.relpath(file_path, self.current_session.repo_path)
-            logger.info(f"   {i}. {rel_path} (confidence: {confidence:.1f}, reason: {reason})")
+        if logger.isEnabledFor(logging.INFO):
+            for i, (file_path, confidence, reason) in enumerate(candidate_files[:5], 1):
+                logger.info("   %d. %s (confidence: %.1f, reason: %s)", i, self._rel_path(file_path), confidence, reason)
         
         return top_files
     
+    def _rel_path(self, file_path: str) -> str:
+        """Return file_path relative to the session's repository, computing each path once per session."""
+        rel_path = self._rel_paths.get(file_path)
+        if rel_path is None:
+            rel_path = self._rel_paths[file_path] = os.path.relpath(file_path, self.current_session.repo_path)
+        return rel_path
+    
     def generate_fix_for_file(self, file_path: str, issue: str) -> Optional[FileFix]:
         """Generate a fix for a specific file using LLM with rich context."""
         
@@ -273,146 +654,432 @@ class SelfHealingAgent:
             return None
         
         try:
-            # Read current file content
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                original_content = f.read()
+            original_content = self._read_source(file_path)
+            if original_content is None:
+                return None
             
-            # Generate rich context using all intelligence layers
-            context = self._generate_comprehensive_context(file_path, issue)
+            cache_key = self._fix_cache_key(file_path, original_content, issue)
+            if cache_key in self._fix_cache:
+                logger.info("♻️ Reusing previous fix result for unchanged %s", self._rel_path(file_path))
+                return self._cached_fix(cache_key)
             
-            # Create enhanced LLM prompt with better prioritization
-            prompt = f"""You are an expert Python developer specializing in critical bug fixes. Fix ONLY the most critical issues in this file.
-
-File: {os.path.basename(file_path)}
-Issue Context: {issue}
+            file_fix = self._request_fix(file_path, issue, original_content)
+            self._cache_fix(cache_key, file_fix)
+            return file_fix
+            
+        except Exception as e:
+            logger.error(f"❌ Failed to generate fix for {file_path}: {e}")
+            return None
+    
+    def _request_fix(self, file_path: str, issue: str, original_content: str) -> Optional[FileFix]:
+        """Ask the LLM for one file's fix; returns None if it should not be applied and raises on failed requests."""
+        prompt = self._build_fix_prompt(file_path, issue, original_content)[1]
+        
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("🤖 Generating fix for %s", self._rel_path(file_path))
+        
+        # Get LLM response as JSON matching _PATCH_FIX_SCHEMA, stopping
+        # as soon as its confidence shows the fix would not be applied
+        response = self.genai_client.generate_text(
+            prompt, max_tokens=4096, response_schema=_PATCH_FIX_SCHEMA, stop_when=_is_low_confidence
+        )
+        if _is_low_confidence(response):
+            logger.info("ℹ️ Low-confidence fix for %s, skipping", self._rel_path(file_path))
+            return None
+        applied, file_fix = self._fix_from_patch_entry(file_path, original_content, json.loads(response))
+        if applied:
+            return file_fix
+        
+        # Fall back to asking for the complete file
+        logger.warning(f"⚠️  Patch did not apply to {file_path}, requesting full content")
+        prompt = self._build_fix_prompt(file_path, issue, original_content, patch=False)[1]
+        response = self.genai_client.generate_text(
+            prompt, max_tokens=4096, response_schema=_FIX_SCHEMA, stop_when=_is_low_confidence
+        )
+        if _is_low_confidence(response):
+            logger.info("ℹ️ Low-confidence fix for %s, skipping", self._rel_path(file_path))
+            return None
+        return self._fix_from_entry(file_path, original_content, json.loads(response))
+    
+    def _read_source(self, file_path: str) -> Optional[str]:
+        """
+        Read a file to fix, reusing the last read while its mtime and size are unchanged.
+        
+        Returns None, without reading, for files over max_file_bytes, which
+        would not leave room for a useful prompt.
+        """
+        st = os.stat(file_path)
+        if self.max_file_bytes and st.st_size > self.max_file_bytes:
+            logger.warning(f"⚠️  {self._rel_path(file_path)} is too large to fix ({st.st_size} bytes), skipping")
+            return None
+        
+        stat_key = (st.st_mtime_ns, st.st_size)
+        cached = self._content_cache.get(file_path)
+        if cached is not None and cached[0] == stat_key:
+            return cached[1]
+        
+        content = Path(file_path).read_text(encoding='utf-8', errors='ignore')
+        self._content_cache[file_path] = (stat_key, content)
+        return content
+    
+    def _fix_cache_key(self, file_path: str, original_content: str, issue: str) -> Tuple[str, str, str]:
+        """Key a fix result by file, content and issue."""
+        return (
+            file_path,
+            hashlib.blake2b(original_content.encode('utf-8'), digest_size=16).hexdigest(),
+            hashlib.blake2b(issue.encode('utf-8'), digest_size=16).hexdigest()
+        )
+    
+    def _cached_fix(self, cache_key: Tuple[str, str, str]) -> Optional[FileFix]:
+        """Return a cached fix result, marked as recently used and as part of the current iteration."""
+        self._fix_cache.move_to_end(cache_key)
+        file_fix = self._fix_cache[cache_key]
+        if file_fix is not None and self.current_session:
+            file_fix = replace(file_fix, iteration=self.current_session.current_iteration)
+        return file_fix
+    
+    def _cache_fix(self, cache_key: Tuple[str, str, str], file_fix: Optional[FileFix]) -> None:
+        """Store a fix result, evicting the least recently used beyond _FIX_CACHE_SIZE."""
+        self._fix_cache[cache_key] = file_fix
+        self._fix_cache.move_to_end(cache_key)
+        if len(self._fix_cache) > _FIX_CACHE_SIZE:
+            self._fix_cache.popitem(last=False)
+    
+    def generate_fixes_for_files(self, file_issues: List[Tuple[str, str]]) -> List[Optional[FileFix]]:
+        """
+        Generate fixes for several (file_path, issue) pairs with one concurrent LLM batch.
+        
+        Small files are packed into shared prompts up to _BATCH_TOKEN_BUDGET
+        estimated tokens, so the repository context is sent once per group and
+        the model answers with one JSON entry per file. A file that fills the
+        budget on its own gets the regular single-file prompt. Results are
+        returned in input order; files whose prompt or response fails yield
+        None, as with generate_fix_for_file.
+        """
+        if not self.genai_client:
+            logger.warning(f"⚠️  LLM unavailable, skipping {len(file_issues)} files")
+            return [None] * len(file_issues)
+        
+        fixes: List[Optional[FileFix]] = [None] * len(file_issues)
+        cache_keys: Dict[int, Tuple[str, str, str]] = {}
+        
+        # Read every file, reuse results for unchanged files, then pack the
+        # rest greedily into prompt groups
+        groups: List[List[Tuple[int, str]]] = []  # [(index, original_content)] per prompt
+        group_tokens = _BATCH_TOKEN_BUDGET
+        for index, (file_path, issue) in enumerate(file_issues):
+            try:
+                original_content = self._read_source(file_path)
+            except Exception as e:
+                logger.error(f"❌ Failed to generate fix for {file_path}: {e}")
+                continue
+            if original_content is None:
+                continue
+            
+            cache_key = self._fix_cache_key(file_path, original_content, issue)
+            if cache_key in self._fix_cache:
+                fixes[index] = self._cached_fix(cache_key)
+                continue
+            cache_keys[index] = cache_key
+            
+            tokens = (len(original_content) + len(issue)) // _CHARS_PER_TOKEN
+            if group_tokens + tokens > _BATCH_TOKEN_BUDGET:
+                groups.append([])
+                group_tokens = 0
+            groups[-1].append((index, original_content))
+            group_tokens += tokens
+        
+        cached = len(file_issues) - len(cache_keys)
+        if cached:
+            logger.info(f"♻️ Reusing previous fix results for {cached} unchanged files")
+        if not groups:
+            return fixes
+        
+        prompts = []
+        schemas = []
+        for group in groups:
+            if len(group) == 1:
+                index, original_content = group[0]
+                file_path, issue = file_issues[index]
+                prompts.append(self._build_fix_prompt(file_path, issue, original_content)[1])
+                schemas.append(_PATCH_FIX_SCHEMA)
+            else:
+                prompts.append(self._build_batch_fix_prompt(
+                    [(file_issues[index], original_content) for index, original_content in group]
+                ))
+                schemas.append(_BATCH_FIX_SCHEMA)
+        
+        logger.info(f"🤖 Generating fixes for {sum(map(len, groups))} files in {len(prompts)} LLM requests")
+        try:
+            responses = self.genai_client.generate_batch(prompts, max_tokens=4096, response_schemas=schemas)
+        except Exception as e:
+            logger.error(f"❌ Batched fix generation failed: {e}")
+            return fixes
+        
+        unpatched = []  # (index, original_content) of files whose patch did not apply
+        for group, response in zip(groups, responses):
+            if len(group) == 1:
+                index, original_content = group[0]
+                file_path, issue = file_issues[index]
+                try:
+                    applied, fixes[index] = self._fix_from_patch_entry(file_path, original_content, json.loads(response))
+                except ValueError:
+                    logger.error(f"❌ Failed to parse fix response for {file_path}")
+                    continue
+                if applied:
+                    self._cache_fix(cache_keys[index], fixes[index])
+                else:
+                    unpatched.append(group[0])
+            else:
+                for index, file_fix, answered in self._parse_batch_fix_response(file_issues, group, response):
+                    fixes[index] = file_fix
+                    if answered:
+                        self._cache_fix(cache_keys[index], file_fix)
+        
+        if unpatched:
+            # Fall back to asking for the complete files
+            logger.warning(f"⚠️  Patches did not apply to {len(unpatched)} files, requesting full content")
+            prompts = [
+                self._build_fix_prompt(*file_issues[index], original_content, patch=False)[1]
+                for index, original_content in unpatched
+            ]
+            try:
+                responses = self.genai_client.generate_batch(prompts, max_tokens=4096, response_schemas=[_FIX_SCHEMA] * len(prompts))
+            except Exception as e:
+                logger.error(f"❌ Batched fix generation failed: {e}")
+                return fixes
+            for (index, original_content), response in zip(unpatched, responses):
+                file_path = file_issues[index][0]
+                try:
+                    fixes[index] = self._fix_from_entry(file_path, original_content, json.loads(response))
+                except ValueError:
+                    logger.error(f"❌ Failed to parse fix response for {file_path}")
+                    continue
+                self._cache_fix(cache_keys[index], fixes[index])
+        return fixes
+    
+    def _build_batch_fix_prompt(self, entries: List[Tuple[Tuple[str, str], str]]) -> str:
+        """Build one fix prompt covering several ((file_path, issue), original_content) entries."""
+        file_blocks = []
+        for (file_path, issue), original_content in entries:
+            file_context = self._file_info_context(file_path)
+            file_blocks.append(
+                f'<FILE path="{self._rel_path(file_path)}">\n'
+                f"Issue Context: {issue}{file_context}\n"
+                f"```python\n{original_content}\n```\n"
+                f"</FILE>"
+            )
+        files_text = '\n\n'.join(file_blocks)
+        
+        return f"""You are an expert Python developer specializing in critical bug fixes. Fix ONLY the most critical issues in each of the files below.
 
 Repository Context:
-{context}
+{self._symbols_context()}
+{_FIX_PATTERNS_CONTEXT}
 
-Current File Content:
-```python
-{original_content}
-```
+Files:
+{files_text}
 
-CRITICAL FIXING PRIORITIES (fix in this order):
-1. RUNTIME ERRORS: NameError, AttributeError, ImportError, TypeError
-2. SYNTAX ERRORS: Missing colons, parentheses, indentation
-3. WINDOWS COMPATIBILITY: Unicode/encoding issues (use ASCII-safe characters)
-4. MISSING DEPENDENCIES: Undefined classes, functions, imports
-5. LOGIC ERRORS: Type mismatches, incorrect algorithms
+{_FIX_GUIDELINES}
 
-IMPORTANT RULES:
-- For Windows console: Replace Unicode symbols (✅❌🔍) with ASCII (OK/FAIL/INFO)
-- Fix undefined classes/functions by either importing or defining them
-- Only fix critical issues that break execution
-- Ignore cosmetic issues like print statements unless they cause encoding errors
-- Preserve original functionality and structure
-- Use proper error handling and type checking
+Respond with a JSON array holding one object per file:
+- path: the file path exactly as given in its FILE tag
+{_FIX_RESPONSE_FIELDS}
+{_FIXED_CODE_FIELD}
+
+Important: Always provide the complete file content in fixed_code, never partial code."""
+    
+    def _parse_batch_fix_response(
+        self,
+        file_issues: List[Tuple[str, str]],
+        group: List[Tuple[int, str]],
+        response: str
+    ) -> List[Tuple[int, Optional[FileFix], bool]]:
+        """
+        Parse a batched JSON fix response into (index, FileFix or None, answered) for the group.
+        
+        answered is True when the model gave the file a fix or explicitly
+        answered NO_FIX_NEEDED, and False when its entry is missing or malformed.
+        """
+        try:
+            entries = json.loads(response)
+        except ValueError:
+            logger.error(f"❌ Failed to parse batched fix response for {len(group)} files")
+            return [(index, None, False) for index, _ in group]
+        
+        entries_by_path = {}
+        if isinstance(entries, list):
+            for entry in entries:
+                if isinstance(entry, dict):
+                    entries_by_path[entry.get('path')] = entry
+        
+        results = []
+        for index, original_content in group:
+            file_path, _ = file_issues[index]
+            entry = entries_by_path.get(self._rel_path(file_path))
+            file_fix = self._fix_from_entry(file_path, original_content, entry)
+            answered = file_fix is not None or (
+                entry is not None and (entry.get('fixed_code') or '').strip() == "NO_FIX_NEEDED"
+            )
+            results.append((index, file_fix, answered))
+        return results
+    
+    def _build_fix_prompt(
+        self,
+        file_path: str,
+        issue: str,
+        original_content: Optional[str] = None,
+        patch: bool = True
+    ) -> Tuple[str, str]:
+        """
+        Build a file's fix prompt, reading it unless its content is given; returns (original_content, prompt).
+        
+        With patch the model answers with a unified diff (_PATCH_FIX_SCHEMA),
+        otherwise with the complete corrected file (_FIX_SCHEMA).
+        """
+        # Read current file content
+        if original_content is None:
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                original_content = f.read()
+        
+        if patch:
+            response_format = f"""{_FIXED_PATCH_FIELD}
 
-Provide your response in this exact format:
+Important: Change only the lines the fix needs; context and removed lines must match the current file exactly."""
+        else:
+            response_format = f"""{_FIXED_CODE_FIELD}
 
-ISSUE_FOUND: [Describe the specific critical issue you found, or "No critical issues found"]
-CONFIDENCE: [Your confidence level from 0.0 to 1.0]
-FIXED_CODE:
-```
-[The complete corrected file content, or "NO_FIX_NEEDED" if no changes required]
+Important: Always provide the complete file content in fixed_code, never partial code."""
+        
+        # Create enhanced LLM prompt with better prioritization. The repository
+        # context is identical for every file, so it leads the prompt where
+        # Vertex AI prefix caching can reuse it across calls.
+        prompt = f"""You are an expert Python developer specializing in critical bug fixes. Fix ONLY the most critical issues in this file.
+
+Repository Context:
+{self._symbols_context()}
+{_FIX_PATTERNS_CONTEXT}
+
+File: {os.path.basename(file_path)}
+Issue Context: {issue}{self._file_info_context(file_path)}
+
+Current File Content:
+```python
+{original_content}
 ```
 
-Important: Always provide the complete file content in FIXED_CODE section, never partial code."""
+{_FIX_GUIDELINES}
 
-            logger.info(f"🤖 Generating fix for {os.path.relpath(file_path, self.current_session.repo_path)}")
-            
-            # Get LLM response
-            response = self.genai_client.generate_text(prompt, max_tokens=4096)
-            
-            # Parse response
-            return self._parse_fix_response(file_path, issue, original_content, response)
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to generate fix for {file_path}: {e}")
-            return None
+Respond with a JSON object:
+{_FIX_RESPONSE_FIELDS}
+{response_format}"""
+        
+        return original_content, prompt
     
-    def _parse_fix_response(self, file_path: str, issue: str, original_content: str, response: str) -> Optional[FileFix]:
-        """Parse LLM response into a FileFix object."""
+    def _fix_from_patch_entry(
+        self,
+        file_path: str,
+        original_content: str,
+        entry: Optional[Dict[str, Any]]
+    ) -> Tuple[bool, Optional[FileFix]]:
+        """
+        Build a FileFix by applying a structured patch response entry to the original content.
+        
+        Returns (applied, file_fix); applied is False when the patch does not
+        apply, so the caller can fall back to a full-content prompt.
+        """
+        if not isinstance(entry, dict):
+            entry = {}
+        patch = (entry.get('fixed_patch') or '').strip()
+        if not patch or patch == "NO_FIX_NEEDED":
+            return True, self._fix_from_entry(file_path, original_content, entry, patch)
+        
+        patched_content = _apply_unified_diff(original_content, patch)
+        if patched_content is None:
+            return False, None
+        return True, self._fix_from_entry(file_path, original_content, entry, patched_content)
+    
+    def _fix_from_entry(
+        self,
+        file_path: str,
+        original_content: str,
+        entry: Optional[Dict[str, Any]],
+        fixed_code: Optional[str] = None
+    ) -> Optional[FileFix]:
+        """Build a FileFix from a structured fix response entry, or None if it holds no fix; fixed_code overrides the entry's."""
+        if not isinstance(entry, dict):
+            entry = {}
+        if fixed_code is None:
+            fixed_code = (entry.get('fixed_code') or '').strip()
+        
+        # Check if no fix needed
+        if fixed_code == "NO_FIX_NEEDED":
+            return None
+        
+        if not fixed_code:
+            logger.warning(f"⚠️  No fixed code found in LLM response for {file_path}")
+            return None
+        
+        issue_found = entry.get('issue_found') or "Unknown issue"
         try:
-            lines = response.split('\n')
-            
-            issue_found = "Unknown issue"
+            confidence = float(entry.get('confidence', 0.5))
+        except (TypeError, ValueError):
             confidence = 0.5
-            fixed_code = None
-            
-            i = 0
-            while i < len(lines):
-                line = lines[i].strip()
-                
-                if line.startswith('ISSUE_FOUND:'):
-                    issue_found = line.replace('ISSUE_FOUND:', '').strip()
-                elif line.startswith('CONFIDENCE:'):
-                    confidence_str = line.replace('CONFIDENCE:', '').strip()
-                    try:
-                        confidence = float(confidence_str)
-                    except ValueError:
-                        confidence = 0.5
-                elif line.startswith('FIXED_CODE:'):
-                    # Read the code block
-                    i += 1
-                    # Skip to the opening ```python or just ```
-                    while i < len(lines) and not lines[i].strip().startswith('```'):
-                        i += 1
-                    
-                    if i < len(lines):  # Found opening ```
-                        i += 1  # Skip the ``` line
-                        code_lines = []
-                        while i < len(lines) and not lines[i].strip().startswith('```'):
-                            code_lines.append(lines[i])
-                            i += 1
-                        fixed_code = '\n'.join(code_lines).strip()
-                i += 1
-            
-            # Check if no fix needed
-            if fixed_code and fixed_code.strip() == "NO_FIX_NEEDED":
-                return None
-            
-            if not fixed_code:
-                logger.warning(f"⚠️  No fixed code found in LLM response for {file_path}")
-                return None
-            
-            return FileFix(
-                file_path=file_path,
-                issue_found=issue_found,
-                fix_applied=f"LLM fix: {issue_found}",
-                original_content=original_content,
-                modified_content=fixed_code,
-                confidence=confidence,
-                iteration=self.current_session.current_iteration if self.current_session else 1
-            )
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to parse fix response: {e}")
-            return None
+        
+        return FileFix(
+            file_path=file_path,
+            issue_found=issue_found,
+            fix_applied=f"LLM fix: {issue_found}",
+            original_content=original_content,
+            modified_content=fixed_code,
+            confidence=confidence,
+            iteration=self.current_session.current_iteration if self.current_session else 1
+        )
     
     def apply_fix(self, file_fix: FileFix) -> bool:
         """Apply a fix to a file with backup."""
+        if file_fix.modified_content == file_fix.original_content:
+            logger.info(f"ℹ️ Fix for {os.path.basename(file_fix.file_path)} changes nothing, skipping")
+            return False
+        
+        # Write a sibling temp file and swap it in, so readers never see a
+        # truncated file
+        tmp_path = file_fix.file_path + '.tmp'
         try:
-            # Create backup
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(file_fix.modified_content)
+            shutil.copymode(file_fix.file_path, tmp_path)
+            
+            # Create backup: a hardlink keeps the old inode, which the rename
+            # below leaves untouched; copy where hardlinks are unsupported
             backup_path = f"{file_fix.file_path}.backup.{int(time.time())}"
-            shutil.copy2(file_fix.file_path, backup_path)
+            try:
+                os.link(file_fix.file_path, backup_path)
+            except OSError:
+                shutil.copy2(file_fix.file_path, backup_path)
             
             # Apply fix
-            with open(file_fix.file_path, 'w', encoding='utf-8') as f:
-                f.write(file_fix.modified_content)
+            os.replace(tmp_path, file_fix.file_path)
+            
+            # The written content is what the next read would return, unless
+            # reading translates its carriage returns
+            if '\r' in file_fix.modified_content:
+                self._content_cache.pop(file_fix.file_path, None)
+            else:
+                st = os.stat(file_fix.file_path)
+                self._content_cache[file_fix.file_path] = ((st.st_mtime_ns, st.st_size), file_fix.modified_content)
             
             # Track fix
+            rel_path = self._rel_path(file_fix.file_path)
             self.current_session.files_modified.add(file_fix.file_path)
             self.current_session.fixes_applied.append({
                 'iteration': file_fix.iteration,
-                'file': os.path.relpath(file_fix.file_path, self.current_session.repo_path),
+                'file': rel_path,
                 'issue': file_fix.issue_found,
                 'confidence': file_fix.confidence,
                 'backup': backup_path
             })
             
-            rel_path = os.path.relpath(file_fix.file_path, self.current_session.repo_path)
             logger.info(f"✅ Applied fix to {rel_path} (confidence: {file_fix.confidence:.2f})")
             logger.info(f"   Issue: {file_fix.issue_found}")
             logger.info(f"   Backup: {os.path.basename(backup_path)}")
@@ -421,43 +1088,32 @@ Important: Always provide the complete file content in FIXED_CODE section, never
             
         except Exception as e:
             logger.error(f"❌ Failed to apply fix to {file_fix.file_path}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
             return False
     
     def test_python_file_execution(self, file_path: str) -> tuple[bool, str]:
         """Test if a Python file can run without syntax errors."""
         try:
-            rel_path = os.path.relpath(file_path, self.current_session.repo_path)
-            logger.info(f"🧪 Testing execution: {rel_path}")
+            logger.info("🧪 Testing execution: %s", self._rel_path(file_path))
             
-            # Change to the file's directory for proper imports
-            file_dir = os.path.dirname(file_path)
-            original_cwd = os.getcwd()
+            # Run from the file's directory for proper imports, in a process
+            # forked from a pre-warmed interpreter rather than a fresh one. Only
+            # that process changes directory, so several files can be tested at once.
+            returncode, stdout, stderr = run_python_file(file_path, timeout=10)  # 10 second timeout
             
-            try:
-                os.chdir(file_dir)
-                
-                # Use subprocess to run the file with a timeout
-                result = subprocess.run(
-                    [sys.executable, os.path.basename(file_path)], 
-                    capture_output=True, 
-                    text=True, 
-                    timeout=10,  # 10 second timeout
-                    cwd=file_dir
-                )
-                
-                if result.returncode == 0:
-                    logger.info(f"   ✅ Execution successful!")
-                    if result.stdout.strip():
-                        logger.info(f"   📄 Output: {result.stdout.strip()[:100]}...")
-                    return True, result.stdout
-                else:
-                    logger.warning(f"   ❌ Execution failed with return code {result.returncode}")
-                    if result.stderr.strip():
-                        logger.warning(f"   📄 Error: {result.stderr.strip()[:200]}...")
-                    return False, result.stderr
-                    
-            finally:
-                os.chdir(original_cwd)
+            if returncode == 0:
+                logger.info(f"   ✅ Execution successful!")
+                if stdout.strip():
+                    logger.info("   📄 Output: %.100s...", stdout.strip())
+                return True, stdout
+            else:
+                logger.warning(f"   ❌ Execution failed with return code {returncode}")
+                if stderr.strip():
+                    logger.warning("   📄 Error: %.200s...", stderr.strip())
+                return False, stderr
                 
         except subprocess.TimeoutExpired:
             logger.warning(f"   ⏰ Execution timeout (10s) - file may have infinite loop or long-running process")
@@ -469,15 +1125,55 @@ Important: Always provide the complete file content in FIXED_CODE section, never
             logger.warning(f"   ❌ Execution test failed: {e}")
             return False, str(e)
     
-    def verify_fix_effectiveness(self) -> bool:
-        """Verify if the applied fixes resolved the issue."""
+    def _syntax_ok(self, file_path: str) -> Tuple[bool, str]:
+        """Check that a Python file parses, without running it."""
+        try:
+            ast.parse(Path(file_path).read_bytes(), filename=file_path)
+            return True, ""
+        except SyntaxError as e:
+            return False, f"SyntaxError: {e.msg} (line {e.lineno})"
+        except (OSError, ValueError) as e:
+            return False, str(e)
+    
+    def _reindex_modified_files(self) -> bool:
+        """Re-index the session's modified files and merge them into the dependency data."""
+        file_info_map, dependency_map = self._fast_analyzer.reindex_files(list(self.current_session.files_modified))
+        
+        dependency_data = self.analyzer.dependency_data
+        if dependency_data is not None:
+            dependency_data.setdefault('files', {}).update(file_info_map)
+            dependency_data.setdefault('dependencies', {}).update(dependency_map)
+            self.analyzer.mark_data_changed()
+            self._file_symbols.update(
+                (file_path, FileSymbols.from_file_info(file_info))
+                for file_path, file_info in file_info_map.items()
+            )
+            self._symbols_context_str = None
+        return True
+    
+    def verify_fix_effectiveness(self, run_files: bool = False, full_reanalysis: bool = False) -> bool:
+        """
+        Verify if the applied fixes resolved the issue.
+        
+        Only the modified files are re-indexed unless full_reanalysis is set
+        (or no earlier analysis exists), which re-scans the whole repository as
+        a final check. Modified Python files are syntax-checked in-process. With
+        run_files=True the files that parse are also executed in a separate process,
+        which catches runtime errors but runs their side effects.
+        """
         logger.info("🔍 Verifying fix effectiveness...")
         
         # Step 1: Basic syntax analysis
         try:
-            # Re-analyze repository to check for obvious errors
-            analyzer = FastRepositoryAnalyzer(self.current_session.repo_path, quick_mode=True)
-            success = analyzer.analyze_repository()
+            if full_reanalysis or self._fast_analyzer is None:
+                # Re-analyze repository to check for obvious errors
+                analyzer = FastRepositoryAnalyzer(self.current_session.repo_path, quick_mode=True)
+                success = analyzer.analyze_repository()
+                if success:
+                    self._fast_analyzer = analyzer
+            else:
+                # Only the modified files changed since the last analysis
+                success = self._reindex_modified_files()
             
             if not success:
                 logger.warning("⚠️  Repository analysis failed - may have introduced errors")
@@ -486,27 +1182,38 @@ Important: Always provide the complete file content in FIXED_CODE section, never
             logger.error(f"❌ Syntax verification failed: {e}")
             return False
         
-        # Step 2: Runtime testing of modified Python files
-        runtime_results = []
-        for file_path in self.current_session.files_modified:
-            if file_path.endswith('.py'):
-                can_run, output = self.test_python_file_execution(file_path)
-                runtime_results.append((file_path, can_run, output))
+        # Step 2: Syntax-check modified Python files without executing them
+        py_files = [file_path for file_path in self.current_session.files_modified if file_path.endswith('.py')]
+        runtime_results = [(file_path, *self._syntax_ok(file_path)) for file_path in py_files]
+        
+        # Step 3 (opt-in): Runtime testing of the files that parse, run
+        # concurrently since each test just waits on its own process
+        if run_files:
+            runnable = [file_path for file_path, can_run, _ in runtime_results if can_run]
+            if runnable:
+                with ThreadPoolExecutor(max_workers=min(8, len(runnable))) as executor:
+                    outcomes = dict(zip(runnable, executor.map(self.test_python_file_execution, runnable)))
+                runtime_results = [
+                    (file_path, *outcomes[file_path]) if file_path in outcomes else (file_path, can_run, output)
+                    for file_path, can_run, output in runtime_results
+                ]
         
         # Report results
         if runtime_results:
             successful_runs = sum(1 for _, can_run, _ in runtime_results if can_run)
             total_tests = len(runtime_results)
             
-            logger.info(f"🧪 Runtime Test Results: {successful_runs}/{total_tests} files executed successfully")
+            if run_files:
+                logger.info(f"🧪 Runtime Test Results: {successful_runs}/{total_tests} files executed successfully")
+            else:
+                logger.info(f"🧪 Syntax Check Results: {successful_runs}/{total_tests} files parsed successfully")
             
             # Show details for failed runs
             for file_path, can_run, output in runtime_results:
-                rel_path = os.path.relpath(file_path, self.current_session.repo_path)
                 if not can_run:
-                    logger.warning(f"   ❌ {rel_path}: {output[:100]}...")
-                else:
-                    logger.info(f"   ✅ {rel_path}: Working correctly")
+                    logger.warning("   ❌ %s: %.100s...", self._rel_path(file_path), output)
+                elif logger.isEnabledFor(logging.INFO):
+                    logger.info("   ✅ %s: Working correctly", self._rel_path(file_path))
             
             # Consider it successful if at least 80% of files run correctly
             success_rate = successful_runs / total_tests if total_tests > 0 else 1.0
@@ -521,65 +1228,105 @@ Important: Always provide the complete file content in FIXED_CODE section, never
             logger.info("✅ Repository analysis successful - no obvious syntax errors")
             return True
     
-    def _generate_comprehensive_context(self, file_path: str, issue: str) -> str:
-        """Generate rich context for LLM using all intelligence layers."""
-        context_parts = []
+    def _symbols_context(self) -> str:
+        """Return the repository-wide symbols block, built once per analysis."""
+        if self._symbols_context_str is None:
+            self._symbols_context_str = self._build_symbols_context()
+        return self._symbols_context_str
+    
+    def _build_symbols_context(self) -> str:
+        """
+        Describe the classes and functions available across the repository.
         
+        Files are ranked by relevance to the session's issue and added until
+        context_budget_tokens is reached, so the block stays bounded on large
+        repositories. The ranking depends only on the issue, which keeps the
+        block identical across every fix prompt in a session.
+        """
         # Layer 1: Available classes and functions across the repository
-        available_symbols = {}
-        for file_path_key, file_info in self.analyzer.dependency_data.get('files', {}).items():
-            try:
-                symbols = file_info.get('symbols', [])
-                if symbols and isinstance(symbols, list):
-                    file_name = os.path.basename(file_path_key)
-                    classes = []
-                    functions = []
-                    
-                    for s in symbols:
-                        if isinstance(s, dict):
-                            symbol_type = s.get('type', '')
-                            symbol_name = s.get('name', '')
-                            if symbol_name:
-                                if symbol_type == 'class':
-                                    classes.append(symbol_name)
-                                elif symbol_type == 'function':
-                                    functions.append(symbol_name)
-                    
-                    if classes or functions:
-                        available_symbols[file_name] = {
-                            'classes': classes,
-                            'functions': functions,
-                            'imports': file_info.get('imports', []) if isinstance(file_info.get('imports', []), list) else []
-                        }
-            except Exception as e:
-                # Skip this file if there's an issue with symbol processing
-                continue
+        file_entries = []  # (file path, symbol names, context lines)
+        for file_path_key, file_symbols in self._file_symbols.items():
+            classes = file_symbols.classes
+            functions = file_symbols.functions
+            if classes or functions:
+                lines = [f"  {os.path.basename(file_path_key)}:"]
+                if classes:
+                    lines.append(f"    Classes: {', '.join(classes)}")
+                if functions:
+                    lines.append(f"    Functions: {', '.join(functions)}")
+                file_entries.append((file_path_key, classes + functions, '\n'.join(lines)))
         
-        context_parts.append(f"AVAILABLE SYMBOLS ACROSS REPOSITORY:")
-        for file_name, symbols in available_symbols.items():
-            if symbols['classes'] or symbols['functions']:
-                context_parts.append(f"  {file_name}:")
-                if symbols['classes']:
-                    context_parts.append(f"    Classes: {', '.join(symbols['classes'])}")
-                if symbols['functions']:
-                    context_parts.append(f"    Functions: {', '.join(symbols['functions'][:10])}...")  # Limit to first 10
-        
-        # Layer 2: Current file info
-        file_info = self.analyzer.dependency_data.get('files', {}).get(file_path, {})
-        if file_info:
-            context_parts.append(f"\nCURRENT FILE INFO:")
-            context_parts.append(f"  Imports: {file_info.get('imports', [])}")
-            context_parts.append(f"  Symbols: {len(file_info.get('symbols', []))} defined")
-        
-        # Layer 3: Common Python patterns for missing dependencies
-        context_parts.append(f"\nCOMMON FIX PATTERNS:")
-        context_parts.append(f"  - For missing classes: Define class or import from another file")
-        context_parts.append(f"  - For encoding errors: Replace Unicode with ASCII equivalents")
-        context_parts.append(f"  - For NameError: Check if function/variable is defined or imported")
-        context_parts.append(f"  - For Windows: Use 'utf-8' encoding and ASCII symbols")
+        # Most relevant files first; ties keep index order
+        relevance = self._context_relevance(file_entries)
+        ranked = sorted(range(len(file_entries)), key=lambda index: -relevance[index])
+        
+        context_parts = ["AVAILABLE SYMBOLS ACROSS REPOSITORY:"]
+        char_budget = self.context_budget_tokens * _CHARS_PER_TOKEN
+        used_chars = len(context_parts[0])
+        omitted = 0
+        for index in ranked:
+            block = file_entries[index][2]
+            if char_budget and used_chars + len(block) + 1 > char_budget:
+                omitted += 1
+                continue
+            context_parts.append(block)
+            used_chars += len(block) + 1
+        if omitted:
+            context_parts.append(f"  ({omitted} less relevant files omitted)")
         
         return '\n'.join(context_parts)
     
+    def _context_relevance(self, file_entries: List[Tuple[str, List[str], str]]) -> List[float]:
+        """
+        Score each symbols-context entry's relevance to the session's issue.
+        
+        A file scores one point per issue keyword found in its path or symbol
+        names, plus 1/distance if it is within _CONTEXT_GRAPH_DEPTH knowledge
+        graph hops of a file that matched.
+        """
+        issue = self.current_session.issue_description.lower() if self.current_session else ''
+        keywords = set(re.findall(r'\w{3,}', issue))
+        if not keywords:
+            return [0.0] * len(file_entries)
+        
+        scores = []
+        for file_path, symbol_names, _ in file_entries:
+            text = ' '.join([file_path, *symbol_names]).lower()
+            scores.append(float(sum(keyword in text for keyword in keywords)))
+        
+        # Layer 2: Breadth-first search outward from the matching files,
+        # following dependencies in both directions
+        kg = self.analyzer.kg
+        if kg:
+            distances = {f"file:{file_path}": 0 for (file_path, _, _), score in zip(file_entries, scores) if score}
+            frontier = list(distances)
+            for depth in range(1, _CONTEXT_GRAPH_DEPTH + 1):
+                next_frontier = []
+                for node_id in frontier:
+                    for neighbor in kg.adjacency.get(node_id, []) + kg.reverse_adjacency.get(node_id, []):
+                        if neighbor not in distances:
+                            distances[neighbor] = depth
+                            next_frontier.append(neighbor)
+                frontier = next_frontier
+            
+            for index, (file_path, _, _) in enumerate(file_entries):
+                distance = distances.get(f"file:{file_path}")
+                if distance:
+                    scores[index] += 1.0 / distance
+        
+        return scores
+    
+    def _file_info_context(self, file_path: str) -> str:
+        """Describe one file's imports and symbols, or '' when it is not indexed."""
+        file_symbols = self._file_symbols.get(file_path)
+        if file_symbols is None:
+            return ''
+        return (
+            f"\nCURRENT FILE INFO:\n"
+            f"  Imports: {file_symbols.imports}\n"
+            f"  Symbols: {file_symbols.symbol_count} defined"
+        )
+    
     def heal_repository(self, repo_path: str, issue: str, max_iterations: int = 3, timeout: int = 120) -> HealingSession:
         """Main healing process with strategic planning."""
         session = self.start_healing_session(repo_path, issue, max_iterations, timeout)
@@ -630,7 +1377,7 @@ Important: Always provide the complete file content in FIXED_CODE section, never
             session.status = "failed"
             session.final_message = f"Healing failed: {str(e)}"
         finally:
-            session.total_time = (datetime.now() - session.start_time).total_seconds()
+            session.total_time = time.monotonic() - session.start_monotonic
         
         return session
     
@@ -643,8 +1390,7 @@ Important: Always provide the complete file content in FIXED_CODE section, never
             session.current_iteration = iteration
             
             # Check timeout
-            elapsed = (datetime.now() - session.start_time).total_seconds()
-            if elapsed >= timeout:
+            if time.monotonic() >= session.deadline:
                 session.status = "timeout"
                 session.final_message = f"Reached timeout of {timeout}s"
                 break
@@ -664,29 +1410,35 @@ Important: Always provide the complete file content in FIXED_CODE section, never
             
             fixes_applied = 0
             
-            # Execute task on target files
+            # Build one fix request per existing target file
+            file_issues = []
             for file_path in current_task.target_files:
                 if not os.path.exists(file_path):
                     logger.warning(f"⚠️ File not found: {file_path}")
                     continue
                 
-                logger.info(f"🔧 Processing: {os.path.relpath(file_path, session.repo_path)}")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("🔧 Processing: %s", self._rel_path(file_path))
                 
                 # Create task-specific issue description
                 task_issues = [issue.description for issue in current_task.issues_to_fix if issue.file_path == file_path]
                 task_description = f"Task {current_task.priority}: {current_task.strategy}. Issues: {'; '.join(task_issues[:3])}"
-                
-                # Generate strategic fix
-                file_fix = self.generate_fix_for_file(file_path, task_description)
-                
-                if file_fix and file_fix.confidence > 0.3:
-                    if self.apply_fix(file_fix):
+                file_issues.append((file_path, task_description))
+            
+            # Generate strategic fixes concurrently, then apply them one by one
+            file_fixes = self.generate_fixes_for_files(file_issues)
+            for (file_path, _), file_fix in zip(file_issues, file_fixes):
+                if file_fix and file_fix.confidence > _MIN_FIX_CONFIDENCE:
+                    if file_fix.modified_content == file_fix.original_content:
+                        # Nothing to write; apply_fix would skip it too
+                        logger.info("ℹ️ Fix for %s changes nothing, skipping", self._rel_path(file_path))
+                    elif self.apply_fix(file_fix):
                         fixes_applied += 1
                         session.fixes_applied += 1
                     else:
-                        logger.warning(f"❌ Failed to apply fix to {os.path.basename(file_path)}")
-                else:
-                    logger.info(f"❌ No suitable fix generated for {os.path.basename(file_path)}")
+                        logger.warning("❌ Failed to apply fix to %s", self._rel_path(file_path))
+                elif logger.isEnabledFor(logging.INFO):
+                    logger.info("❌ No suitable fix generated for %s", self._rel_path(file_path))
             
             logger.info(f"📊 Task {current_task.task_id}: {fixes_applied} fixes applied")
             
@@ -717,7 +1469,7 @@ Important: Always provide the complete file content in FIXED_CODE section, never
                     continue
                 
                 file_fix = self.generate_fix_for_file(file_path, session.issue_description)
-                if file_fix and file_fix.confidence > 0.3:
+                if file_fix and file_fix.confidence > _MIN_FIX_CONFIDENCE:
                     if self.apply_fix(file_fix):
                         fixes_applied_this_iteration += 1
                         session.fixes_applied += 1
@@ -736,21 +1488,15 @@ Important: Always provide the complete file content in FIXED_CODE section, never
         if not self.current_plan or not self.current_plan.tasks:
             return None
         
-        # Combine all target files from all tasks, prioritized by critical path
-        planned_files = []
-        
-        # Add critical path files first
-        for file_path in self.current_plan.critical_path:
-            if file_path not in planned_files:
-                planned_files.append(file_path)
+        # Combine all target files from all tasks, prioritized by critical
+        # path; dict keys keep the first occurrence of each file in order
+        planned_files = dict.fromkeys(self.current_plan.critical_path)
         
         # Add remaining task target files
         for task in self.current_plan.tasks:
-            for file_path in task.target_files:
-                if file_path not in planned_files:
-                    planned_files.append(file_path)
+            planned_files.update(dict.fromkeys(task.target_files))
         
-        return planned_files[:10]  # Limit to top 10 files
+        return list(planned_files)[:10]  # Limit to top 10 files
     
     def _finalize_session(self, session: HealingSession):
         """Finalize healing session with summary."""
@@ -769,8 +1515,7 @@ Important: Always provide the complete file content in FIXED_CODE section, never
         if session.files_modified:
             logger.info("📋 Modified files:")
             for file_path in session.files_modified:
-                rel_path = os.path.relpath(file_path, session.repo_path)
-                logger.info(f"   - {rel_path}")
+                logger.info("   - %s", self._rel_path(file_path))
         
         # Show fixes applied
         if session.fixes_applied:
@@ -797,6 +1542,8 @@ Examples:
     parser.add_argument('--max-iterations', type=int, default=3, help='Maximum number of fix iterations (default: 3)')
     parser.add_argument('--timeout', type=int, default=120, help='Timeout in seconds (default: 120)')
     parser.add_argument('--service-account', default='prj-mm-genai-qa-001_sa-notebook-1c2123a13a2a.json', help='Path to GCP service account JSON')
+    parser.add_argument('--context-budget-tokens', type=int, default=_CONTEXT_BUDGET_TOKENS, help=f'Estimated token budget for repository symbols in fix prompts, 0 for no limit (default: {_CONTEXT_BUDGET_TOKENS})')
+    parser.add_argument('--max-file-bytes', type=int, default=_MAX_FIX_FILE_BYTES, help=f'Skip fixing files larger than this many bytes, 0 for no limit (default: {_MAX_FIX_FILE_BYTES})')
     parser.add_argument('--verbose', '-v', action='store_true', help='Verbose logging')
     
     if len(sys.argv) == 1:
@@ -824,7 +1571,11 @@ Examples:
     
     try:
         # Create and run self-healing agent
-        agent = SelfHealingAgent(args.service_account)
+        agent = SelfHealingAgent(
+            args.service_account,
+            context_budget_tokens=args.context_budget_tokens,
+            max_file_bytes=args.max_file_bytes
+        )
         
         session = agent.heal_repository(
             repo_path=args.repository,
@@ -9,8 +9,10 @@ Ensures fixes actually work by running the code and detecting remaining issues.
 import os
 import sys
 import ast
+import asyncio
 import subprocess
-import tempfile
+import importlib.util
+import importlib.machinery
 import logging
 from typing import Dict, List, Any, Tuple, Optional
 from dataclasses import dataclass
@@ -18,6 +20,11 @@ from pathlib import Path
 import json
 import time
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.file_runner import FORK_AVAILABLE, _FAST_FAIL_GRACE, run_python_file
+from agents.file_walk import iter_python_files
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 logger = logging.getLogger(__name__)
@@ -33,14 +40,119 @@ class VerificationResult:
     remaining_issues: List[str]
     execution_time: float
     memory_usage: Optional[float] = None
+
+# Build and cache directories not searched for Python files
+_SKIP_DIRS = frozenset({'__pycache__', 'venv', 'env', 'node_modules', 'build', 'dist'})
+
+# Output on stderr showing that a run has already failed
+_FATAL_MARKERS = (b'Traceback (most recent call last):', b'SyntaxError:')
+_FATAL_MARKER_OVERLAP = max(map(len, _FATAL_MARKERS)) - 1
+
+# Lowercase substrings marking an issue as critical (blocking execution)
+_CRITICAL_KEYWORDS = (
+    'syntax error', 'runtime error', 'import error', 'traceback',
+    'modulenotfounderror', 'importerror', 'syntaxerror', 'nameerror',
+    'indentationerror', 'division by zero', 'zerodivisionerror',
+    'execution timeout', 'infinite loop'
+)
+
+# Performance issue messages, in the order issues on one line are reported
+_PERF_MESSAGES = [
+    "Print statement on line {} (performance impact)",
+    "Blocking sleep on line {} (performance bottleneck)",
+    "Inefficient loop pattern on line {} (use enumerate)",
+    "File operation without context manager on line {}",
+]
+_PRINT, _SLEEP, _RANGE_LEN, _OPEN = range(len(_PERF_MESSAGES))
+
+class _PerformanceVisitor(ast.NodeVisitor):
+    """Collect (line, issue kind) pairs for performance anti-patterns in a syntax tree."""
+    
+    def __init__(self):
+        self.issues = set()
+        self._managed_calls = set()  # ids of calls used as with-statement contexts
+    
+    def visit_With(self, node):
+        for item in node.items:
+            if isinstance(item.context_expr, ast.Call):
+                self._managed_calls.add(id(item.context_expr))
+        self.generic_visit(node)
+    
+    visit_AsyncWith = visit_With
+    
+    def visit_Call(self, node):
+        func = node.func
+        if isinstance(func, ast.Name):
+            if func.id == 'print':
+                self.issues.add((node.lineno, _PRINT))
+            elif func.id == 'open' and id(node) not in self._managed_calls:
+                self.issues.add((node.lineno, _OPEN))
+        elif isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name):
+            if func.value.id == 'time' and func.attr == 'sleep':
+                self.issues.add((node.lineno, _SLEEP))
+        self.generic_visit(node)
+    
+    def _check_loop(self, iter_node, lineno):
+        # range(len(...))
+        if (isinstance(iter_node, ast.Call) and isinstance(iter_node.func, ast.Name)
+                and iter_node.func.id == 'range' and iter_node.args
+                and isinstance(iter_node.args[0], ast.Call)
+                and isinstance(iter_node.args[0].func, ast.Name)
+                and iter_node.args[0].func.id == 'len'):
+            self.issues.add((lineno, _RANGE_LEN))
+    
+    def visit_For(self, node):
+        self._check_loop(node.iter, node.lineno)
+        self.generic_visit(node)
+    
+    visit_AsyncFor = visit_For
+    
+    def visit_comprehension(self, node):
+        self._check_loop(node.iter, node.iter.lineno)
+        self.generic_visit(node)
+
+# Exceptions whose handlers make the imports in a try block optional
+_IMPORT_GUARDS = frozenset({'ImportError', 'ModuleNotFoundError', 'Exception', 'BaseException'})
+
+def _handles_import_error(handler: ast.ExceptHandler) -> bool:
+    """Whether an except clause catches a failed import."""
+    if handler.type is None:
+        return True
+    types = handler.type.elts if isinstance(handler.type, ast.Tuple) else [handler.type]
+    return any(
+        (isinstance(t, ast.Name) and t.id in _IMPORT_GUARDS) or
+        (isinstance(t, ast.Attribute) and t.attr in _IMPORT_GUARDS)
+        for t in types
+    )
+
+def _required_imports(nodes):
+    """Yield the import statements among nodes and their children, skipping optional imports."""
+    for node in nodes:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            yield node
+        elif isinstance(node, ast.Try) and any(map(_handles_import_error, node.handlers)):
+            yield from _required_imports(node.handlers + node.orelse + node.finalbody)
+        else:
+            yield from _required_imports(ast.iter_child_nodes(node))
     
 class CodeVerificationAgent:
     """Agent that verifies fixed code and provides feedback."""
     
-    def __init__(self, repository_path: str):
+    def __init__(self, repository_path: str, max_workers: Optional[int] = None):
         self.repository_path = os.path.abspath(repository_path)
         self.verification_results = {}
         
+        # Files verified concurrently (default: two per CPU)
+        self.max_workers = max_workers or 2 * (os.cpu_count() or 1)
+        
+        # File contents and syntax trees by path with the (st_mtime_ns,
+        # st_size) they were read at, shared by every static check and reused
+        # across iterations until a file changes
+        self._ast_cache: Dict[str, Tuple[Tuple[int, int], str, ast.Module]] = {}
+        
+        # Python files found in the repository, kept until healing may have changed them
+        self._python_files: Optional[List[str]] = None
+        
     def verify_repository(self, max_iterations: int = 4) -> Dict[str, Any]:
         """Main verification workflow with iterative feedback loop."""
         
@@ -97,27 +209,47 @@ class CodeVerificationAgent:
         return self._generate_verification_summary(iteration, all_issues_resolved)
     
     def _verify_all_files(self) -> List[VerificationResult]:
-        """Verify all Python files in the repository."""
-        results = []
+        """
+        Verify all Python files in the repository.
+        
+        Files are independent and mostly wait on their test subprocesses, so
+        up to max_workers are verified at once on an event loop; results are
+        reported in file order as soon as they and the files before them are
+        done.
+        """
         python_files = self._find_python_files()
         
         print(f"🔍 Verifying {len(python_files)} Python files...")
         
-        for file_path in python_files:
-            print(f"   📝 Testing: {os.path.basename(file_path)}")
-            result = self._verify_single_file(file_path)
+        return asyncio.run(self._verify_files_async(python_files))
+    
+    async def _verify_files_async(self, python_files: List[str]) -> List[VerificationResult]:
+        """Verify files concurrently, at most max_workers at a time."""
+        semaphore = asyncio.Semaphore(self.max_workers)
+        
+        async def verify_one(file_path: str) -> VerificationResult:
+            async with semaphore:
+                return await self._verify_single_file_async(file_path)
+        
+        results = []
+        tasks = [asyncio.create_task(verify_one(file_path)) for file_path in python_files]
+        for file_path, task in zip(python_files, tasks):
+            result = await task
+            self._report_file_result(file_path, result)
             results.append(result)
-            
-            # Show immediate result
-            if result.syntax_valid and result.execution_successful:
-                print(f"      ✅ Passed")
-            else:
-                issues = len(result.runtime_errors) + len(result.remaining_issues)
-                print(f"      ❌ Failed ({issues} issues)")
         
         return results
     
-    def _verify_single_file(self, file_path: str) -> VerificationResult:
+    def _report_file_result(self, file_path: str, result: VerificationResult):
+        """Print one file's verification outcome."""
+        print(f"   📝 Testing: {os.path.basename(file_path)}")
+        if result.syntax_valid and result.execution_successful:
+            print(f"      ✅ Passed")
+        else:
+            issues = len(result.runtime_errors) + len(result.remaining_issues)
+            print(f"      ❌ Failed ({issues} issues)")
+    
+    async def _verify_single_file_async(self, file_path: str) -> VerificationResult:
         """Verify a single Python file."""
         result = VerificationResult(
             file_path=file_path,
@@ -129,31 +261,27 @@ class CodeVerificationAgent:
             execution_time=0.0
         )
         
+        # Step 1: Read and validate syntax
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except Exception as e:
-            result.remaining_issues.append(f"File read error: {e}")
-            return result
-        
-        # Step 1: Syntax validation
-        try:
-            ast.parse(content)
+            content, tree = self._get_ast(file_path)
             result.syntax_valid = True
         except SyntaxError as e:
             result.remaining_issues.append(f"Syntax error: {e} (line {e.lineno})")
             return result  # Can't test execution if syntax is invalid
+        except Exception as e:
+            result.remaining_issues.append(f"File read error: {e}")
+            return result
         
         # Step 2: Static analysis for common issues
-        result.performance_issues.extend(self._check_performance_issues(content))
+        result.performance_issues.extend(self._check_performance_issues(tree))
         
         # Step 3: Execution testing
         if self._is_executable_file(file_path, content):
-            result.execution_successful, execution_errors, result.execution_time = self._test_execution(file_path)
+            result.execution_successful, execution_errors, result.execution_time = await self._test_execution(file_path)
             result.runtime_errors.extend(execution_errors)
         else:
             # For non-executable files, just check imports
-            import_errors = self._check_imports(content)
+            import_errors = self._check_imports(tree, file_path)
             if import_errors:
                 result.runtime_errors.extend(import_errors)
             else:
@@ -165,48 +293,45 @@ class CodeVerificationAgent:
         
         return result
     
+    def _get_ast(self, file_path: str) -> Tuple[str, ast.Module]:
+        """
+        Read and parse a file, reusing the last parse while its mtime and size are unchanged.
+        
+        Raises SyntaxError for invalid code and OSError/UnicodeDecodeError
+        if the file cannot be read.
+        """
+        st = os.stat(file_path)
+        stat_key = (st.st_mtime_ns, st.st_size)
+        cached = self._ast_cache.get(file_path)
+        if cached is not None and cached[0] == stat_key:
+            return cached[1:]
+        
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        tree = ast.parse(content)
+        self._ast_cache[file_path] = (stat_key, content, tree)
+        return content, tree
+    
     def _find_python_files(self) -> List[str]:
-        """Find all Python files in the repository."""
-        python_files = []
-        
-        for root, dirs, files in os.walk(self.repository_path):
-            # Skip hidden directories and common build/cache directories
-            dirs[:] = [d for d in dirs if not d.startswith('.') and d not in {
-                '__pycache__', 'venv', 'env', 'node_modules', 'build', 'dist'
-            }]
-            
-            for file in files:
-                if file.endswith('.py') and not file.startswith('.'):
-                    file_path = os.path.join(root, file)
-                    python_files.append(file_path)
+        """Find all Python files in the repository, walking it only once between healing runs."""
+        if self._python_files is not None:
+            return self._python_files
         
+        python_files = [entry.path for entry in iter_python_files(self.repository_path, _SKIP_DIRS)]
+        self._python_files = python_files
         return python_files
     
-    def _check_performance_issues(self, content: str) -> List[str]:
-        """Check for performance issues in code."""
-        issues = []
-        lines = content.split('\n')
-        
-        for line_num, line in enumerate(lines, 1):
-            line_stripped = line.strip()
-            
-            # Check for print statements (performance issue in production)
-            if 'print(' in line_stripped and not line_stripped.startswith('#'):
-                issues.append(f"Print statement on line {line_num} (performance impact)")
-            
-            # Check for time.sleep (blocking operations)
-            if 'time.sleep(' in line_stripped:
-                issues.append(f"Blocking sleep on line {line_num} (performance bottleneck)")
-            
-            # Check for inefficient patterns
-            if 'for' in line_stripped and 'range(len(' in line_stripped:
-                issues.append(f"Inefficient loop pattern on line {line_num} (use enumerate)")
-            
-            # Check for missing error handling
-            if 'open(' in line_stripped and 'with' not in line_stripped:
-                issues.append(f"File operation without context manager on line {line_num}")
-        
-        return issues
+    def _check_performance_issues(self, tree: ast.Module) -> List[str]:
+        """
+        Check for performance issues in a file's syntax tree.
+        
+        Reports print and time.sleep calls, for loops and comprehensions
+        over range(len(...)), and open() calls outside a with statement, at
+        most once per kind and line; code in comments and strings is ignored.
+        """
+        visitor = _PerformanceVisitor()
+        visitor.visit(tree)
+        return [_PERF_MESSAGES[kind].format(line_num) for line_num, kind in sorted(visitor.issues)]
     
     def _is_executable_file(self, file_path: str, content: str) -> bool:
         """Check if file is executable (has main block or is a script)."""
@@ -225,73 +350,151 @@ class CodeVerificationAgent:
         
         return False
     
-    def _test_execution(self, file_path: str) -> Tuple[bool, List[str], float]:
+    async def _run_python(self, args: List[str], timeout: float, cwd: Optional[str] = None) -> Tuple[int, str, str]:
+        """
+        Run the interpreter with args; returns (returncode, stdout, stderr) and raises subprocess.TimeoutExpired.
+        
+        Used where runner processes are unavailable (no fork). stderr is
+        scanned as it arrives. Once it shows a fatal marker such as a
+        traceback, the process gets _FAST_FAIL_GRACE seconds to exit and is
+        then killed, so a run that already failed but keeps going (e.g. held
+        open by a non-daemon thread) does not wait out the whole timeout. On
+        timeout, the output read so far is attached to the exception.
+        """
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable, *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=cwd
+        )
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        failed = asyncio.Event()
+        stderr_chunks = []
+        
+        async def read_stderr():
+            tail = b''
+            while True:
+                chunk = await proc.stderr.read(65536)
+                if not chunk:
+                    return
+                stderr_chunks.append(chunk)
+                window = tail + chunk
+                if any(marker in window for marker in _FATAL_MARKERS):
+                    failed.set()
+                tail = window[-_FATAL_MARKER_OVERLAP:]
+        
+        stdout_task = asyncio.create_task(proc.stdout.read())
+        stderr_task = asyncio.create_task(read_stderr())
+        exit_task = asyncio.create_task(proc.wait())
+        failed_task = asyncio.create_task(failed.wait())
+        try:
+            await asyncio.wait({exit_task, failed_task}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not exit_task.done() and failed.is_set():
+                grace = min(_FAST_FAIL_GRACE, deadline - loop.time())
+                await asyncio.wait({exit_task}, timeout=max(0, grace))
+                if not exit_task.done():
+                    proc.kill()
+            elif not exit_task.done():
+                proc.kill()
+                await exit_task
+                await asyncio.wait({stdout_task, stderr_task}, timeout=_FAST_FAIL_GRACE)
+                raise subprocess.TimeoutExpired(
+                    [sys.executable, *args], timeout,
+                    output=stdout_task.result() if stdout_task.done() else b'',
+                    stderr=b''.join(stderr_chunks)
+                )
+            
+            await exit_task
+            stdout = await stdout_task
+            await stderr_task
+        finally:
+            for task in (stdout_task, stderr_task, exit_task, failed_task):
+                task.cancel()
+        
+        return (
+            proc.returncode,
+            stdout.decode('utf-8', errors='replace'),
+            b''.join(stderr_chunks).decode('utf-8', errors='replace')
+        )
+    
+    async def _test_execution(self, file_path: str) -> Tuple[bool, List[str], float]:
         """Test if file executes successfully."""
         start_time = time.time()
         
         try:
-            # Run the file with timeout
-            result = subprocess.run(
-                [sys.executable, file_path],
-                capture_output=True,
-                text=True,
-                timeout=30,  # 30 second timeout
-                cwd=os.path.dirname(file_path)
-            )
+            # Run the file with timeout (30 seconds), in a child of a
+            # pre-warmed runner process where fork is available so files
+            # don't each pay for interpreter start-up
+            if FORK_AVAILABLE:
+                returncode, stdout, stderr = await asyncio.to_thread(run_python_file, file_path, 30)
+            else:
+                returncode, stdout, stderr = await self._run_python(
+                    [file_path],
+                    timeout=30,
+                    cwd=os.path.dirname(file_path)
+                )
             
             execution_time = time.time() - start_time
             
-            if result.returncode == 0:
+            if returncode == 0:
                 return True, [], execution_time
             else:
                 errors = []
-                if result.stderr:
-                    errors.append(f"Runtime error: {result.stderr.strip()}")
-                if result.stdout and "Error" in result.stdout:
-                    errors.append(f"Output error: {result.stdout.strip()}")
+                if stderr:
+                    errors.append(f"Runtime error: {stderr.strip()}")
+                if stdout and "Error" in stdout:
+                    errors.append(f"Output error: {stdout.strip()}")
                 
                 return False, errors, execution_time
                 
-        except subprocess.TimeoutExpired:
+        except subprocess.TimeoutExpired as e:
             execution_time = time.time() - start_time
-            return False, ["Execution timeout (>30s) - possible infinite loop"], execution_time
+            errors = ["Execution timeout (>30s) - possible infinite loop"]
+            stderr = e.stderr.decode('utf-8', errors='replace') if isinstance(e.stderr, bytes) else e.stderr
+            if stderr:
+                errors.append(f"Runtime error: {stderr.strip()}")
+            return False, errors, execution_time
             
         except Exception as e:
             execution_time = time.time() - start_time
             return False, [f"Execution failed: {e}"], execution_time
     
-    def _check_imports(self, content: str) -> List[str]:
-        """Check if all imports are valid."""
+    def _check_imports(self, tree: ast.Module, file_path: str) -> List[str]:
+        """
+        Check that the modules a file requires can be found, without running it.
+        
+        Top-level module names are looked up with importlib the way
+        `python file.py` would resolve them: the file's directory first, then
+        sys.path. Submodules are not checked, as finding them would import
+        their parent packages into the agent. Relative imports and imports
+        guarded by an ImportError handler are skipped.
+        """
         import_errors = []
+        search_path = [os.path.dirname(file_path)]
         
         try:
-            # Create a temporary file to test imports
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as tmp_file:
-                # Write only imports to test them
-                lines = content.split('\n')
-                import_lines = []
-                
-                for line in lines:
-                    line_stripped = line.strip()
-                    if line_stripped.startswith(('import ', 'from ')) and not line_stripped.startswith('#'):
-                        import_lines.append(line)
-                
-                tmp_file.write('\n'.join(import_lines))
-                tmp_file.flush()
-                
-                # Test import execution
-                result = subprocess.run(
-                    [sys.executable, tmp_file.name],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                
-                if result.returncode != 0 and result.stderr:
-                    import_errors.append(f"Import error: {result.stderr.strip()}")
+            for node in _required_imports(tree.body):
+                if isinstance(node, ast.ImportFrom):
+                    if node.level:
+                        continue
+                    names = [node.module]
+                else:
+                    names = [alias.name for alias in node.names]
                 
-                # Clean up
-                os.unlink(tmp_file.name)
+                for name in names:
+                    top_level = name.partition('.')[0]
+                    if importlib.machinery.PathFinder.find_spec(top_level, search_path) is not None:
+                        continue
+                    try:
+                        if importlib.util.find_spec(top_level) is not None:
+                            continue
+                    except ValueError:
+                        # Already imported without a spec, e.g. __main__
+                        continue
+                    import_errors.append(
+                        f"Import error: ModuleNotFoundError: No module named '{top_level}' (line {node.lineno})"
+                    )
                 
         except Exception as e:
             import_errors.append(f"Import check failed: {e}")
@@ -379,8 +582,15 @@ class CodeVerificationAgent:
             print(f"   ✅ Healing completed: {healing_session.status}")
             print(f"   🔧 Fixes applied: {len(healing_session.fixes_applied)}")
             
+            # Re-read modified files even if a rewrite kept their mtime and size
+            for file_path in healing_session.files_modified:
+                self._ast_cache.pop(file_path, None)
+            
         except Exception as e:
             print(f"   ❌ Healing agent failed: {e}")
+        finally:
+            # Healing may have added or removed files
+            self._python_files = None
     
     def _filter_critical_issues(self, issues_found: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Filter out only critical issues that prevent code execution."""
@@ -390,12 +600,8 @@ class CodeVerificationAgent:
             critical_problems = []
             for problem in issue.get('issues', []):
                 # Only consider these as critical (blocking execution):
-                if any(keyword in problem.lower() for keyword in [
-                    'syntax error', 'runtime error', 'import error', 'traceback',
-                    'modulenotfounderror', 'importerror', 'syntaxerror', 'nameerror',
-                    'indentationerror', 'division by zero', 'zerodivisionerror',
-                    'execution timeout', 'infinite loop'
-                ]):
+                problem_lower = problem.lower()
+                if any(keyword in problem_lower for keyword in _CRITICAL_KEYWORDS):
                     critical_problems.append(problem)
                 
                 # Skip cosmetic/performance issues that don't break functionality:
@@ -443,6 +649,8 @@ def main():
     parser.add_argument('repository', help='Path to repository to verify')
     parser.add_argument('--max-iterations', type=int, default=4, 
                        help='Maximum verification iterations (default: 4)')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Files verified concurrently (default: twice the CPU count)')
     parser.add_argument('--verbose', '-v', action='store_true', 
                        help='Verbose output')
     
@@ -452,7 +660,7 @@ def main():
         logging.getLogger().setLevel(logging.DEBUG)
     
     # Create and run verification agent
-    agent = CodeVerificationAgent(args.repository)
+    agent = CodeVerificationAgent(args.repository, max_workers=args.workers)
     summary = agent.verify_repository(args.max_iterations)
     
     # Exit with appropriate code
@@ -9,12 +9,34 @@ to the existing indexing system.
 import json
 import os
 import time
-from typing import Dict, List, Set, Optional, Tuple, Any
+import heapq
+from operator import itemgetter
+from typing import Dict, List, Set, Optional, Tuple, Any, Iterable, Iterator, TextIO
 from collections import defaultdict, deque
 from dataclasses import dataclass, asdict
 from enum import Enum
 
-@dataclass
+# Name indicators checked by KnowledgeGraph._detect_patterns for every node
+_FRAMEWORK_INDICATORS = (
+    ('fastapi', ('fastapi', 'starlette', 'pydantic')),
+    ('django', ('django', 'models.model', 'views.view')),
+    ('flask', ('flask', 'app.route', 'request')),
+    ('react', ('react', 'component', 'usestate')),
+    ('angular', ('angular', 'component', 'service')),
+    ('spring', ('springframework', 'autowired', 'component')),
+)
+
+_PATTERN_INDICATORS = (
+    ('controller', ('controller', 'handler', 'endpoint')),
+    ('service', ('service', 'business', 'logic')),
+    ('repository', ('repository', 'dao', 'data')),
+    ('model', ('model', 'entity', 'dto')),
+    ('factory', ('factory', 'builder', 'creator')),
+    ('singleton', ('singleton', 'instance')),
+    ('observer', ('observer', 'listener', 'subscriber')),
+)
+
+@dataclass(slots=True)
 class KnowledgeNode:
     """Represents a node in the knowledge graph."""
     id: str
@@ -24,7 +46,7 @@ class KnowledgeNode:
     file_path: Optional[str] = None
     line_number: Optional[int] = None
 
-@dataclass 
+@dataclass(slots=True)
 class KnowledgeEdge:
     """Represents a relationship in the knowledge graph."""
     source: str  # Node ID
@@ -78,6 +100,24 @@ class KnowledgeGraph:
         self.adjacency[edge.source].append(edge.target)
         self.reverse_adjacency[edge.target].append(edge.source)
         
+    def add_nodes_bulk(self, nodes: List[KnowledgeNode]) -> None:
+        """Add many nodes at once, updating the indexes in a single pass."""
+        self.nodes.update((node.id, node) for node in nodes)
+        nodes_by_type = self.nodes_by_type
+        detect_patterns = self._detect_patterns
+        for node in nodes:
+            nodes_by_type[node.type].append(node.id)
+            detect_patterns(node)
+        
+    def add_edges_bulk(self, edges: List[KnowledgeEdge]) -> None:
+        """Add many edges at once, updating both adjacency lists in a single pass."""
+        self.edges.extend(edges)
+        adjacency = self.adjacency
+        reverse_adjacency = self.reverse_adjacency
+        for edge in edges:
+            adjacency[edge.source].append(edge.target)
+            reverse_adjacency[edge.target].append(edge.source)
+        
     def find_path(self, source: str, target: str, max_depth: int = 5) -> Optional[List[str]]:
         """Find shortest path between two nodes."""
         if source == target:
@@ -104,24 +144,63 @@ class KnowledgeGraph:
         
         return None
     
-    def find_similar_components(self, node_id: str, threshold: float = 0.7) -> List[Tuple[str, float]]:
-        """Find components similar to the given node."""
+    def find_paths_multi(self, source: str, targets: List[str], max_depth: int = 5) -> Dict[str, List[str]]:
+        """Find shortest paths from source to several targets with a single BFS."""
+        remaining = set(targets)
+        found = {}
+        if source in remaining:
+            found[source] = [source]
+            remaining.discard(source)
+        
+        parents = {source: None}
+        frontier = [source]
+        depth = 0
+        
+        while frontier and remaining and depth < max_depth:
+            depth += 1
+            next_frontier = []
+            for current in frontier:
+                for neighbor in self.adjacency.get(current, ()):
+                    if neighbor in parents:
+                        continue
+                    parents[neighbor] = current
+                    next_frontier.append(neighbor)
+                    
+                    if neighbor in remaining:
+                        remaining.discard(neighbor)
+                        path = [neighbor]
+                        while parents[path[-1]] is not None:
+                            path.append(parents[path[-1]])
+                        found[neighbor] = path[::-1]
+            frontier = next_frontier
+        
+        # Preserve the caller's target order
+        return {target: found[target] for target in dict.fromkeys(targets) if target in found}
+    
+    def find_similar_components(self, node_id: str, threshold: float = 0.7,
+                                k: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Find components similar to the given node, most similar first.
+        
+        With k, only the k most similar components are returned.
+        """
         if node_id not in self.nodes:
             return []
             
-        node = self.nodes[node_id]
-        similar = []
+        nodes = self.nodes
+        node = nodes[node_id]
+        calculate_similarity = self._calculate_similarity
         
         # Compare with nodes of same type
-        for candidate_id in self.nodes_by_type[node.type]:
-            if candidate_id == node_id:
-                continue
-                
-            similarity = self._calculate_similarity(node, self.nodes[candidate_id])
-            if similarity >= threshold:
-                similar.append((candidate_id, similarity))
-        
-        return sorted(similar, key=lambda x: x[1], reverse=True)
+        scored = (
+            (candidate_id, calculate_similarity(node, nodes[candidate_id]))
+            for candidate_id in self.nodes_by_type[node.type]
+            if candidate_id != node_id
+        )
+        similar = (pair for pair in scored if pair[1] >= threshold)
+        
+        if k is None:
+            return sorted(similar, key=itemgetter(1), reverse=True)
+        return heapq.nlargest(k, similar, key=itemgetter(1))
     
     def detect_architectural_patterns(self) -> Dict[str, List[str]]:
         """Detect common architectural patterns in the codebase."""
@@ -357,52 +436,41 @@ class KnowledgeGraph:
             "edges": len(self.edges)
         }
     
-    def export_graph(self, format: str = 'json') -> str:
-        """Export the knowledge graph in various formats."""
+    def export_graph(self, format: str = 'json', fp: Optional[TextIO] = None) -> Optional[str]:
+        """Export the knowledge graph in various formats.
+        
+        When an open text file is given as fp the export is streamed into it
+        chunk by chunk and None is returned; otherwise the full string is returned.
+        """
         if format == 'json':
-            return json.dumps({
-                'nodes': [asdict(node) for node in self.nodes.values()],
-                'edges': [asdict(edge) for edge in self.edges]
-            }, indent=2)
+            chunks = self._iter_json()
         elif format == 'dot':
-            return self._export_dot()
+            chunks = self._iter_dot()
         elif format == 'cypher':
-            return self._export_cypher()
+            chunks = self._iter_cypher()
         else:
             raise ValueError(f"Unsupported format: {format}")
+        
+        if fp is None:
+            return ''.join(chunks)
+        fp.writelines(chunks)
+        return None
     
     def _detect_patterns(self, node: KnowledgeNode) -> None:
         """Detect patterns and frameworks from node characteristics."""
         name_lower = node.name.lower()
         
-        # Framework detection
-        frameworks = {
-            'fastapi': ['fastapi', 'starlette', 'pydantic'],
-            'django': ['django', 'models.model', 'views.view'],
-            'flask': ['flask', 'app.route', 'request'],
-            'react': ['react', 'component', 'usestate'],
-            'angular': ['angular', 'component', 'service'],
-            'spring': ['springframework', 'autowired', 'component']
-        }
+        node_id = node.id
         
-        for framework, indicators in frameworks.items():
+        # Framework detection
+        for framework, indicators in _FRAMEWORK_INDICATORS:
             if any(indicator in name_lower for indicator in indicators):
-                self.framework_detection[framework].append(node.id)
+                self.framework_detection[framework].append(node_id)
         
         # Pattern detection
-        patterns = {
-            'controller': ['controller', 'handler', 'endpoint'],
-            'service': ['service', 'business', 'logic'],
-            'repository': ['repository', 'dao', 'data'],
-            'model': ['model', 'entity', 'dto'],
-            'factory': ['factory', 'builder', 'creator'],
-            'singleton': ['singleton', 'instance'],
-            'observer': ['observer', 'listener', 'subscriber']
-        }
-        
-        for pattern, indicators in patterns.items():
+        for pattern, indicators in _PATTERN_INDICATORS:
             if any(indicator in name_lower for indicator in indicators):
-                self.concept_patterns[pattern].add(node.id)
+                self.concept_patterns[pattern].add(node_id)
     
     def _calculate_similarity(self, node1: KnowledgeNode, node2: KnowledgeNode) -> float:
         """Calculate similarity between two nodes."""
@@ -466,35 +534,55 @@ class KnowledgeGraph:
         
         return cycles
     
-    def _export_dot(self) -> str:
-        """Export as DOT format for Graphviz."""
-        lines = ["digraph knowledge_graph {"]
+    def _iter_json(self) -> Iterator[str]:
+        """Yield the JSON export (same layout as json.dumps(indent=2)) piece by piece."""
+        yield '{\n  "nodes": '
+        yield from self._iter_json_array(asdict(node) for node in self.nodes.values())
+        yield ',\n  "edges": '
+        yield from self._iter_json_array(asdict(edge) for edge in self.edges)
+        yield '\n}'
+    
+    @staticmethod
+    def _iter_json_array(items: Iterable[Dict[str, Any]]) -> Iterator[str]:
+        """Yield a JSON array nested one level deep, encoding one element at a time."""
+        # Encoded JSON never contains raw newlines inside strings, so re-indenting
+        # each element is a plain replace.
+        separator = '[\n    '
+        for item in items:
+            yield separator + json.dumps(item, indent=2).replace('\n', '\n    ')
+            separator = ',\n    '
+        yield '[]' if separator == '[\n    ' else '\n  ]'
+    
+    def _iter_dot(self) -> Iterator[str]:
+        """Yield the graph in DOT format for Graphviz."""
+        yield "digraph knowledge_graph {"
         
         # Add nodes
         for node in self.nodes.values():
-            lines.append(f'  "{node.id}" [label="{node.name}" shape=box];')
+            yield f'\n  "{node.id}" [label="{node.name}" shape=box];'
         
         # Add edges
         for edge in self.edges:
-            lines.append(f'  "{edge.source}" -> "{edge.target}" [label="{edge.relationship}"];')
+            yield f'\n  "{edge.source}" -> "{edge.target}" [label="{edge.relationship}"];'
         
-        lines.append("}")
-        return "\n".join(lines)
+        yield "\n}"
     
-    def _export_cypher(self) -> str:
-        """Export as Cypher queries for Neo4j."""
-        queries = []
+    def _iter_cypher(self) -> Iterator[str]:
+        """Yield the graph as Cypher queries for Neo4j."""
+        separator = ""
         
         # Create nodes
         for node in self.nodes.values():
             attrs = json.dumps(node.attributes) if node.attributes else "{}"
-            queries.append(f"CREATE (:{node.type} {{id: '{node.id}', name: '{node.name}', attributes: {attrs}}})")
+            yield f"{separator}CREATE (:{node.type} {{id: '{node.id}', name: '{node.name}', attributes: {attrs}}})"
+            separator = ";\n"
         
         # Create relationships
         for edge in self.edges:
-            queries.append(f"MATCH (a {{id: '{edge.source}'}}), (b {{id: '{edge.target}'}}) CREATE (a)-[:{edge.relationship.upper()}]->(b)")
+            yield f"{separator}MATCH (a {{id: '{edge.source}'}}), (b {{id: '{edge.target}'}}) CREATE (a)-[:{edge.relationship.upper()}]->(b)"
+            separator = ";\n"
         
-        return ";\n".join(queries) + ";"
+        yield ";"
 
 
 def integrate_with_existing_analyzer():